@@ -10,7 +10,7 @@ from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Dict, List, Set
 from src.kalshi_client import KalshiClient
-from src.strategies import StrategyManager
+from src.strategies import StrategyManager, send_notification
 from src.config import Config, extract_city_code
 from src.logger import setup_logging
 from src.outcome_tracker import OutcomeTracker
@@ -576,15 +576,7 @@ class KalshiTradingBot:
     
     def _send_notification(self, title: str, message: str):
         """Send macOS notification"""
-        try:
-            import subprocess
-            script = f'''
-            display notification "{message}" with title "{title}"
-            '''
-            subprocess.run(['osascript', '-e', script], capture_output=True)
-        except Exception as e:
-            # Silently fail if notifications don't work
-            pass
+        send_notification(title, message)
     
     def scan_and_trade(self):
         """Scan markets and execute trades"""
@@ -613,11 +605,22 @@ class KalshiTradingBot:
             resting_snapshot = []
         else:
             try:
-                resting_snapshot = self.client.get_orders(status='resting', use_cache=False)
+                # Copy: strategies append placed orders to the snapshot, the client cache is separate
+                resting_snapshot = list(self.client.get_orders(status='resting', use_cache=False))
             except Exception:
                 resting_snapshot = None  # strategies will fall back to per-call API fetch
+        # Same for positions, so per-market exposure checks don't each hit the API
+        try:
+            positions_snapshot = self.client.get_positions()
+        except Exception:
+            positions_snapshot = None  # strategies will fall back to per-call API fetch
+        if self.outcome_tracker:
+            self.outcome_tracker.note_positions(positions_snapshot)
+        scan_now = datetime.now()
         for strategy in self.strategy_manager.strategies:
             strategy._resting_orders_snapshot = resting_snapshot
+            strategy._positions_snapshot = positions_snapshot
+            strategy._scan_now = scan_now
 
         try:
             # Filter markets by relevant series FIRST to reduce API calls
@@ -706,7 +709,7 @@ class KalshiTradingBot:
                     series = market.get('series_ticker', '') or market.get('series_ticker_symbol', '')
                     status = market.get('status', 'unknown')
                     volume = market.get('volume', 0)
-                    if series and series not in Config.WEATHER_SERIES and not any(ticker.startswith(p) for p in ['KXHIGH', 'KXLOW']):
+                    if series and series not in Config.WEATHER_SERIES_SET and not ticker.startswith(Config.WEATHER_TICKER_PREFIXES):
                         logger.debug(f"📊 SKIP {ticker}: not a weather series ({series})")
                     elif status not in ('open', 'active'):
                         logger.debug(f"📊 SKIP {ticker}: status={status} (need open/active)")
@@ -758,14 +761,8 @@ class KalshiTradingBot:
                         self._recently_ordered_tickers[market_ticker] = time.time()
                         self._scan_traded_count += 1
 
-                        # Refresh resting orders snapshot after placement (skip in paper mode — no real orders)
-                        if not Config.PAPER_TRADING:
-                            try:
-                                resting_snapshot = self.client.get_orders(status='resting', use_cache=False)
-                                for s in self.strategy_manager.strategies:
-                                    s._resting_orders_snapshot = resting_snapshot
-                            except Exception as e:
-                                logger.debug(f"Failed to refresh resting orders: {e}")
+                        # execute_trade already added the new order to the shared resting
+                        # orders snapshot, so no refetch is needed here
 
                         # Record trade on dashboard
                         self.dashboard_state.record_trade(
@@ -809,14 +806,7 @@ class KalshiTradingBot:
                         self._recently_ordered_tickers[market_ticker] = time.time()
                         self._scan_traded_count += 1
 
-                        # Refresh resting orders snapshot after placement (skip in paper mode)
-                        if not Config.PAPER_TRADING:
-                            try:
-                                resting_snapshot = self.client.get_orders(status='resting', use_cache=False)
-                                for s in self.strategy_manager.strategies:
-                                    s._resting_orders_snapshot = resting_snapshot
-                            except Exception as e:
-                                logger.debug(f"Failed to refresh resting orders: {e}")
+                        # Snapshots were updated in place by execute_trade (no refetch)
 
                         self.dashboard_state.record_trade(
                             decision.get('action', 'buy'),
@@ -836,9 +826,11 @@ class KalshiTradingBot:
             self.dashboard_state.record_error()
             logger.error(f"Error in scan_and_trade: {e}", exc_info=True)
         finally:
-            # Clear resting orders snapshot at end of scan
+            # Clear resting orders / positions snapshots and scan time at end of scan
             for strategy in self.strategy_manager.strategies:
                 strategy._resting_orders_snapshot = None
+                strategy._positions_snapshot = None
+                strategy._scan_now = None
     
     async def handle_websocket_messages(self, websocket):
         """Handle incoming WebSocket messages"""
@@ -1072,12 +1064,22 @@ class KalshiTradingBot:
                     # Manage market maker orders (requote if outbid)
                     self._manage_market_maker_orders()
 
-                    # Check for settled positions and update forecast model (every hour)
-                    outcome_check_interval = 3600  # 1 hour
-                    if self.outcome_tracker and time.time() - self.last_outcome_check >= outcome_check_interval:
+                    # Check for settled positions and update forecast model. Settlements
+                    # pushed over WebSocket are handled right away; the full polling pass
+                    # runs hourly, or daily as a reconciliation sweep while WS is connected.
+                    pushed_settlements = self.ws_price_cache.pop_settled() if self.ws_price_cache else set()
+                    if self.ws_price_cache and self.ws_price_cache.is_connected():
+                        outcome_check_interval = Config.OUTCOME_RECONCILE_INTERVAL_WS
+                    else:
+                        outcome_check_interval = Config.OUTCOME_CHECK_INTERVAL
+                    poll_due = time.time() - self.last_outcome_check >= outcome_check_interval
+                    if self.outcome_tracker and (poll_due or pushed_settlements):
                         try:
-                            settlement_results = self.outcome_tracker.run_outcome_check() or []
-                            self.last_outcome_check = time.time()
+                            if poll_due:
+                                settlement_results = self.outcome_tracker.run_outcome_check() or []
+                                self.last_outcome_check = time.time()
+                            else:
+                                settlement_results = self.outcome_tracker.run_outcome_check(pushed_settlements) or []
                             for result in settlement_results:
                                 self.dashboard_state.record_settlement(result.get('ticker', '?'), result.get('won', False), result.get('pnl', 0))
                                 if Config.PAPER_TRADING:
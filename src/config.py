@@ -98,6 +98,7 @@ class Config:
     # 24/7 free-tier: Pirate Weather 10k/month (no daily reset) → need ~333/day → TTL ≥ 156 min. Default 3h (10800) keeps all APIs in free tier.
     FORECAST_CACHE_TTL = int(os.getenv('FORECAST_CACHE_TTL', '10800'))  # 3 hours (was 30 min)
     ENSEMBLE_CACHE_TTL = int(os.getenv('ENSEMBLE_CACHE_TTL', '3600'))  # 1 hour for ensemble data
+    PROB_CACHE_TTL = int(os.getenv('PROB_CACHE_TTL', '1800'))  # 30 min for per-(city, date) probability distributions
 
     # Weather Data Source Configuration
     # Enable/disable specific data sources (all enabled by default)
@@ -227,6 +228,11 @@ class Config:
     WEBSOCKET_CACHE_ENABLED = os.getenv('WEBSOCKET_CACHE_ENABLED', 'false').lower() == 'true'
     WEBSOCKET_CACHE_MAX_AGE = int(os.getenv('WEBSOCKET_CACHE_MAX_AGE', '10'))  # Max age in seconds before fallback to REST
 
+    # Outcome checks: settlements pushed over WebSocket are logged on arrival; the full
+    # polling pass is a reconciliation sweep, run less often while the WS is connected
+    OUTCOME_CHECK_INTERVAL = int(os.getenv('OUTCOME_CHECK_INTERVAL', '3600'))  # Poll interval (seconds) without WS
+    OUTCOME_RECONCILE_INTERVAL_WS = int(os.getenv('OUTCOME_RECONCILE_INTERVAL_WS', '86400'))  # Poll interval (seconds) while WS is connected
+
     # ML Prediction Layer (Ridge + RandomForest blend)
     ML_ENABLED = os.getenv('ML_ENABLED', 'false').lower() == 'true'
     ML_BLEND_WEIGHT = float(os.getenv('ML_BLEND_WEIGHT', '0.3'))  # Weight for ML prediction in mean blend (0.0-1.0)
@@ -261,6 +267,9 @@ class Config:
         'KXHIGHTOKC',               # Oklahoma City (HIGH only)
         'KXHIGHTSFO',               # San Francisco (HIGH only)
     ]
+    # Precomputed for per-market checks: set membership and one C-level startswith()
+    WEATHER_SERIES_SET = frozenset(WEATHER_SERIES)
+    WEATHER_TICKER_PREFIXES = ('KXHIGH', 'KXLOW')
     
     @classmethod
     def validate(cls):
@@ -13,6 +13,15 @@ from .config import Config
 
 logger = logging.getLogger(__name__)
 
+# orjson is optional — faster response parsing when installed, stdlib json otherwise.
+# Both raise a ValueError subclass on malformed bodies.
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 
 # ---------------------------------------------------------------------------
 # Fixed-point API migration helpers (March 2026)
@@ -254,7 +263,7 @@ class KalshiClient:
                 response = self.session.get(url, headers=headers, params=params, timeout=10)
                 response.raise_for_status()
                 try:
-                    result = response.json()
+                    result = _loads(response.content)
                 except (ValueError, json.JSONDecodeError):
                     logger.warning(f"Non-JSON response from GET {path}: {response.text[:200]}")
                     return {}
@@ -295,7 +304,7 @@ class KalshiClient:
                 response = self.session.post(url, headers=headers, json=data, timeout=10)
                 response.raise_for_status()
                 try:
-                    return response.json()
+                    return _loads(response.content)
                 except (ValueError, json.JSONDecodeError):
                     logger.warning(f"Non-JSON response from POST {path}: {response.text[:200]}")
                     return {}
@@ -323,7 +332,7 @@ class KalshiClient:
                 response = self.session.put(url, headers=headers, json=data, timeout=10)
                 response.raise_for_status()
                 try:
-                    return response.json()
+                    return _loads(response.content)
                 except (ValueError, json.JSONDecodeError):
                     logger.warning(f"Non-JSON response from PUT {path}: {response.text[:200]}")
                     return {}
@@ -339,8 +348,8 @@ class KalshiClient:
                     continue
                 raise
 
-    def _delete(self, path: str) -> Dict:
-        """Make authenticated DELETE request"""
+    def _delete(self, path: str, data: Optional[Dict] = None) -> Dict:
+        """Make authenticated DELETE request (data, if given, is sent as the JSON body)"""
         url = f"{self.base_url}{path}"
 
         max_retries = 3
@@ -348,10 +357,10 @@ class KalshiClient:
             try:
                 self._wait_for_rate_limit()
                 headers = self._create_headers('DELETE', path)
-                response = self.session.delete(url, headers=headers, timeout=10)
+                response = self.session.delete(url, headers=headers, json=data, timeout=10)
                 response.raise_for_status()
                 try:
-                    return response.json()
+                    return _loads(response.content)
                 except (ValueError, json.JSONDecodeError):
                     logger.warning(f"Non-JSON response from DELETE {path}: {response.text[:200]}")
                     return {}
@@ -436,24 +445,29 @@ class KalshiClient:
         
         return portfolio
     
-    def get_orders(self, status: Optional[str] = None, use_cache: bool = True) -> List[Dict]:
+    def get_orders(self, status: Optional[str] = None, use_cache: bool = True,
+                   ticker: Optional[str] = None) -> List[Dict]:
         """Get orders, optionally filtered by status. Cached briefly to avoid 429 rate limits.
 
         Args:
             status: Filter by order status ('resting', 'filled', etc.)
             use_cache: If False, bypass cache and fetch fresh data (use for exposure checks)
+            ticker: Only orders for this market (filtered server-side, never cached)
         """
         cache_key = status or 'all'
-        if use_cache and cache_key in self.orders_cache:
+        if use_cache and not ticker and cache_key in self.orders_cache:
             cached_orders, cached_time = self.orders_cache[cache_key]
             if (time.time() - cached_time) < self.orders_cache_ttl:
                 return cached_orders
         params = {}
         if status:
             params['status'] = status
+        if ticker:
+            params['ticker'] = ticker
         response = self._get('/portfolio/orders', params=params)
         orders = [_normalize_order(o) for o in response.get('orders', [])]
-        self.orders_cache[cache_key] = (orders, time.time())
+        if not ticker:
+            self.orders_cache[cache_key] = (orders, time.time())
         return orders
 
     def get_positions(self, ticker: Optional[str] = None) -> List[Dict]:
@@ -472,6 +486,14 @@ class KalshiClient:
         response = self._get('/portfolio/positions', params=params)
         return response.get('market_positions', [])
 
+    def append_resting_order(self, order: Dict):
+        """Add a just-placed resting order to cached order lists (no refetch needed)."""
+        if not order or order.get('status') != 'resting':
+            return
+        for cache_key in ('resting', 'all'):
+            if cache_key in self.orders_cache:
+                self.orders_cache[cache_key][0].append(order)
+
     def invalidate_orders_cache(self):
         """Invalidate the orders cache. Call after placing/canceling orders."""
         self.orders_cache.clear()
@@ -569,6 +591,38 @@ class KalshiClient:
         """Cancel an order"""
         return self._delete(f"/portfolio/orders/{order_id}")
     
+    def cancel_orders_batch(self, order_ids: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Cancel several orders with Kalshi's batch endpoint (up to 20 per request).
+        Falls back to one cancel_order per id if a batch request is rejected.
+
+        Returns {order_id: None if cancelled, else error message}.
+        """
+        results = {}
+        for i in range(0, len(order_ids), 20):
+            chunk = order_ids[i:i + 20]
+            try:
+                response = self._delete('/portfolio/orders/batched', {'ids': chunk})
+            except requests.exceptions.RequestException as e:
+                logger.debug(f"Batch cancel failed ({e}), cancelling {len(chunk)} order(s) individually")
+                for order_id in chunk:
+                    try:
+                        self.cancel_order(order_id)
+                        results[order_id] = None
+                    except Exception as cancel_error:
+                        results[order_id] = str(cancel_error)
+                continue
+            for entry in response.get('orders', []):
+                order_id = entry.get('order_id') or (entry.get('order') or {}).get('order_id')
+                if order_id:
+                    error = entry.get('error')
+                    results[order_id] = (error.get('message') or str(error)) if error else None
+            for order_id in chunk:
+                results.setdefault(order_id, None)
+        if results:
+            self.invalidate_orders_cache()
+        return results
+
     def amend_order(self, order_id: str, yes_price: Optional[int] = None,
                    no_price: Optional[int] = None, count: Optional[int] = None) -> Dict:
         """Amend an existing order"""
@@ -12,6 +12,8 @@ This module:
 4. Updates forecast model with historical accuracy data
 """
 
+import hashlib
+import io
 import json
 import csv
 import logging
@@ -19,11 +21,15 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 from .config import Config, extract_city_code
 
 logger = logging.getLogger(__name__)
 
+# Kalshi market statuses that mean the market has resolved
+SETTLED_STATUSES = frozenset({'closed', 'finalized', 'settled'})
+
 
 class OutcomeTracker:
     """Track market outcomes and forecast accuracy"""
@@ -50,33 +56,41 @@ class OutcomeTracker:
         # Ensure data directory exists
         self.outcomes_file.parent.mkdir(exist_ok=True)
         
-        # Initialize CSV if it doesn't exist
-        if not self.outcomes_file.exists():
-            with open(self.outcomes_file, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    'timestamp', 'market_ticker', 'city', 'date', 'threshold', 'threshold_type',
-                    'our_probability', 'market_price', 'edge', 'ev', 'strategy_mode',
-                    'side', 'contracts', 'entry_price', 'outcome', 'actual_temp',
-                    'predicted_temp', 'forecast_error', 'won', 'profit_loss'
-                ])
-        
         # Track positions we've already logged
         self.logged_positions: set = set()
-        
-        # Load logged positions from file
-        self._load_logged_positions()
-    
-    def _load_logged_positions(self):
-        """Load already-logged positions from outcomes file"""
-        if self.outcomes_file.exists():
-            try:
-                with open(self.outcomes_file, 'r') as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        self.logged_positions.add(row['market_ticker'])
-            except Exception as e:
-                logger.warning(f"Could not load logged positions: {e}")
+
+        # Tickers seen in the bot's positions snapshots (see note_positions); pushed
+        # settlements are only checked for markets we held or traded
+        self.position_tickers: set = set()
+
+        # Initialize CSV header or load logged positions (single file open)
+        self._open_or_init_outcomes()
+
+        # Running performance-report aggregates over outcomes.csv (see _update_report_aggregates)
+        self._report_agg: Optional[Dict] = None
+        self._last_report_digest: Optional[str] = None
+
+    def _open_or_init_outcomes(self):
+        """Write the outcomes header if the file is new, otherwise load already-logged tickers"""
+        try:
+            with open(self.outcomes_file, 'a+', newline='') as f:
+                f.seek(0)
+                reader = csv.reader(f)
+                header = next(reader, None)
+                if header is None:
+                    csv.writer(f).writerow([
+                        'timestamp', 'market_ticker', 'city', 'date', 'threshold', 'threshold_type',
+                        'our_probability', 'market_price', 'edge', 'ev', 'strategy_mode',
+                        'side', 'contracts', 'entry_price', 'outcome', 'actual_temp',
+                        'predicted_temp', 'forecast_error', 'won', 'profit_loss'
+                    ])
+                    return
+                ticker_idx = header.index('market_ticker')
+                for row in reader:
+                    if len(row) > ticker_idx:
+                        self.logged_positions.add(row[ticker_idx])
+        except Exception as e:
+            logger.warning(f"Could not load logged positions: {e}")
     
     def _load_paper_trades(self) -> Dict[str, list]:
         """Load paper trades from data/trades.csv, grouped by market_ticker.
@@ -101,6 +115,23 @@ class OutcomeTracker:
             logger.warning(f"Could not load paper trades: {e}")
         return by_ticker
 
+    def note_positions(self, positions: Optional[List[Dict]]):
+        """Remember tickers from a positions snapshot (kept after the position settles)."""
+        if positions:
+            self.position_tickers.update(p['ticker'] for p in positions if p.get('ticker'))
+
+    def _load_traded_tickers(self) -> set:
+        """All market tickers in data/trades.csv (live and paper)."""
+        trades_file = Path("data/trades.csv")
+        if not trades_file.exists():
+            return set()
+        try:
+            with open(trades_file, 'r') as f:
+                return {row['market_ticker'] for row in csv.DictReader(f) if row.get('market_ticker')}
+        except Exception as e:
+            logger.warning(f"Could not load traded tickers: {e}")
+            return set()
+
     def _lookup_trade_probability(self, market_ticker: str, side: str) -> float:
         """Look up our original probability for a trade from trades.csv."""
         details = self._lookup_trade_details(market_ticker, side)
@@ -149,11 +180,15 @@ class OutcomeTracker:
         except ValueError:
             return None
 
-    def check_settled_positions(self) -> List[Dict]:
+    def check_settled_positions(self, tickers: Optional[set] = None) -> List[Dict]:
         """
         Check portfolio for settled positions (markets that have resolved).
         Groups fills by market_ticker so each market is logged once with aggregated P&L.
         Returns list of settled positions (each has 'fills' list and 'market').
+
+        tickers: restrict the check to these markets (e.g. settlements pushed over
+        WebSocket); fills are then fetched per ticker instead of the full fills page,
+        and only for tickers we held (note_positions) or traded (trades.csv).
         """
         try:
             if Config.PAPER_TRADING:
@@ -163,12 +198,16 @@ class OutcomeTracker:
                 for ticker, trades in paper_trades.items():
                     if ticker in self.logged_positions:
                         continue
+                    if tickers is not None and ticker not in tickers:
+                        continue
                     try:
                         market_response = self.client.get_market(ticker)
                         market = market_response.get('market', market_response)
                         status = market.get('status', '').lower()
                         result = market.get('result', '').lower()
-                        if status in ['closed', 'finalized', 'settled'] and result in ['yes', 'no']:
+                        if status in SETTLED_STATUSES and result in ('yes', 'no'):
+                            market['_status'] = status
+                            market['_result'] = result
                             # Synthesize fill records from paper trades
                             fills = []
                             for t in trades:
@@ -187,7 +226,16 @@ class OutcomeTracker:
                         logger.debug(f"Could not fetch market {ticker}: {e}")
                 return settled_positions
 
-            fills = self.client.get_fills()
+            if tickers is not None:
+                # Only markets we held or traded can have fills; skip the rest of the
+                # exchange's settlements without spending a request on them
+                ours = self.position_tickers | self._load_traded_tickers()
+                fills = []
+                for ticker in tickers:
+                    if ticker in ours and ticker not in self.logged_positions:
+                        fills.extend(self.client.get_fills(ticker=ticker))
+            else:
+                fills = self.client.get_fills()
             # Group fills by market_ticker (same market can have many fill records)
             by_ticker: Dict[str, list] = defaultdict(list)
             for fill in fills:
@@ -204,7 +252,9 @@ class OutcomeTracker:
                     market = market_response.get('market', market_response)  # Unwrap nested response
                     status = market.get('status', '').lower()
                     result = market.get('result', '').lower()
-                    if status in ['closed', 'finalized', 'settled'] and result in ['yes', 'no']:
+                    if status in SETTLED_STATUSES and result in ('yes', 'no'):
+                        market['_status'] = status
+                        market['_result'] = result
                         settled_positions.append({
                             'fills': ticker_fills,
                             'market': market
@@ -227,8 +277,9 @@ class OutcomeTracker:
         3. Return None if we can't determine the actual temp
         """
         try:
-            result = market.get('result', '').lower()
-            if result not in ['yes', 'no']:
+            # check_settled_positions caches the lowered result on the market dict
+            result = market.get('_result') or market.get('result', '').lower()
+            if result not in ('yes', 'no'):
                 return None
 
             # Try NWS observed data first (closes feedback loop for all market types)
@@ -291,10 +342,11 @@ class OutcomeTracker:
             logger.warning(f"Error getting predicted temp for {market_ticker}: {e}")
             return None
     
-    def log_outcome(self, settled_position: Dict):
+    def _compute_outcome(self, settled_position: Dict) -> Optional[Dict]:
         """
-        Log outcome of a settled position to CSV (one row per market, aggregated over all fills).
-        Update forecast model with actual accuracy data.
+        Gather everything needed to log a settled position (actual/predicted temps,
+        aggregated P&L, original trade details) without touching learning state.
+        Safe to run in parallel across positions; returns None if there are no fills.
         """
         try:
             fills = settled_position.get('fills')
@@ -302,7 +354,7 @@ class OutcomeTracker:
                 fill = settled_position.get('fill')
                 fills = [fill] if fill else []
             if not fills:
-                return
+                return None
             market = settled_position['market']
             first_fill = fills[0]
             market_ticker = first_fill.get('ticker')
@@ -326,6 +378,80 @@ class OutcomeTracker:
             forecast_error = None
             if actual_temp and predicted_temp:
                 forecast_error = abs(actual_temp - predicted_temp)
+
+            result = market.get('_result') or market.get('result', '').lower()
+            side = first_fill.get('side', '').lower()
+            won = (side == result)
+            # Side is fixed for the market, so resolve the price field once and
+            # accumulate contracts and cost (cents); P&L follows in one step
+            price_key = 'yes_price' if side == 'yes' else 'no_price'
+            total_count = 0
+            total_cost = 0
+            for fill in fills:
+                count = fill.get('count', 0)
+                total_count += count
+                total_cost += count * fill.get(price_key, 0)
+            if won:
+                total_profit_loss = (total_count * 100 - total_cost) / 100.0
+            else:
+                total_profit_loss = -total_cost / 100.0
+            # Use avg entry price for display (first fill's price as proxy)
+            trade_price = first_fill.get(price_key, 0)
+
+            # Look up original trade decision data
+            trade_details = self._lookup_trade_details(market_ticker, side)
+
+            return {
+                'market_ticker': market_ticker,
+                'series_ticker': series_ticker,
+                'target_date': target_date,
+                'threshold': threshold,
+                'actual_temp': actual_temp,
+                'predicted_temp': predicted_temp,
+                'forecast_error': forecast_error,
+                'result': result,
+                'side': side,
+                'won': won,
+                'total_count': total_count,
+                'total_profit_loss': total_profit_loss,
+                'trade_price': trade_price,
+                'trade_details': trade_details,
+            }
+        except Exception as e:
+            logger.error(f"Error computing outcome: {e}", exc_info=True)
+            return None
+
+    def log_outcome(self, settled_position: Dict, writer, timestamp: Optional[str] = None,
+                    outcome: Optional[Dict] = None):
+        """
+        Log outcome of a settled position to CSV (one row per market, aggregated over all fills).
+        Update forecast model with actual accuracy data.
+
+        writer: csv.writer over the outcomes file, opened once per batch by run_outcome_check.
+        timestamp: ISO timestamp for the row; run_outcome_check passes one snapshot per batch.
+        outcome: precomputed result of _compute_outcome (computed here if not given).
+        """
+        try:
+            if outcome is None:
+                outcome = self._compute_outcome(settled_position)
+            if not outcome:
+                return None
+            market_ticker = outcome['market_ticker']
+            series_ticker = outcome['series_ticker']
+            target_date = outcome['target_date']
+            threshold = outcome['threshold']
+            actual_temp = outcome['actual_temp']
+            predicted_temp = outcome['predicted_temp']
+            forecast_error = outcome['forecast_error']
+            result = outcome['result']
+            side = outcome['side']
+            won = outcome['won']
+            total_count = outcome['total_count']
+            total_profit_loss = outcome['total_profit_loss']
+            trade_price = outcome['trade_price']
+            trade_details = outcome['trade_details']
+
+            if forecast_error is not None:
                 # Update overall forecast error tracking
                 self.weather_agg.update_forecast_error(
                     series_ticker, target_date, actual_temp, predicted_temp
@@ -350,50 +476,28 @@ class OutcomeTracker:
                 except Exception:
                     pass
 
-            result = market.get('result', '').lower()
-            total_count = 0
-            total_profit_loss = 0.0
-            side = first_fill.get('side', '').lower()
-            for fill in fills:
-                count = fill.get('count', 0)
-                trade_price = fill.get('yes_price', 0) if side == 'yes' else fill.get('no_price', 0)
-                won = (side == result)
-                if won:
-                    total_profit_loss += count * (100 - trade_price) / 100.0
-                else:
-                    total_profit_loss -= count * trade_price / 100.0
-                total_count += count
-            # Use avg entry price for display (first fill's price as proxy)
-            trade_price = first_fill.get('yes_price', 0) if side == 'yes' else first_fill.get('no_price', 0)
-            won = (side == result)
-
-            # Look up original trade decision data
-            trade_details = self._lookup_trade_details(market_ticker, side)
-
-            with open(self.outcomes_file, 'a', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    datetime.now().isoformat(),
-                    market_ticker,
-                    series_ticker,
-                    target_date.date().isoformat() if target_date else '',
-                    str(threshold),
-                    'range' if isinstance(threshold, tuple) else 'threshold',
-                    trade_details['our_probability'],
-                    trade_details['market_price'],
-                    trade_details['edge'],
-                    trade_details['ev'],
-                    trade_details['strategy_mode'],
-                    side,
-                    total_count,
-                    trade_price,
-                    result,
-                    actual_temp if actual_temp else '',
-                    predicted_temp if predicted_temp else '',
-                    forecast_error if forecast_error else '',
-                    'YES' if won else 'NO',
-                    f"{total_profit_loss:.2f}"
-                ])
+            writer.writerow([
+                timestamp or datetime.now().isoformat(),
+                market_ticker,
+                series_ticker,
+                target_date.date().isoformat() if target_date else '',
+                str(threshold),
+                'range' if isinstance(threshold, tuple) else 'threshold',
+                trade_details['our_probability'],
+                trade_details['market_price'],
+                trade_details['edge'],
+                trade_details['ev'],
+                trade_details['strategy_mode'],
+                side,
+                total_count,
+                trade_price,
+                result,
+                actual_temp if actual_temp else '',
+                predicted_temp if predicted_temp else '',
+                forecast_error if forecast_error else '',
+                'YES' if won else 'NO',
+                f"{total_profit_loss:.2f}"
+            ])
 
             self.logged_positions.add(market_ticker)
             outcome_symbol = "✅" if won else "❌"
@@ -438,8 +542,8 @@ class OutcomeTracker:
             # Generate post-mortem
             if Config.POSTMORTEM_ENABLED:
                 try:
-                    from .postmortem import PostMortemGenerator
-                    pm_gen = PostMortemGenerator()
+                    from .postmortem import get_postmortem_generator
+                    pm_gen = get_postmortem_generator()
                     source_forecasts = pm_gen._lookup_source_forecasts(market_ticker)
                     pm = pm_gen.generate(
                         market_ticker=market_ticker,
@@ -478,6 +582,95 @@ class OutcomeTracker:
             logger.error(f"Error logging outcome: {e}", exc_info=True)
             return None
     
+    def _update_report_aggregates(self) -> Dict:
+        """
+        Fold rows appended to outcomes.csv since the last call into running aggregates.
+
+        Each row's numeric fields are parsed once per process instead of on every report;
+        only the bytes past the last consumed offset are read. The file is normally only
+        appended to, but tools/backfill_outcomes.py rewrites it in place: if the file
+        was modified without growing, or its header line or the last consumed row no
+        longer sit where we left them, the aggregates are rebuilt from a full re-scan.
+        """
+        agg = self._report_agg
+        st = self.outcomes_file.stat()
+        size = st.st_size
+        if agg is not None and size == agg['offset'] and st.st_mtime_ns == agg['mtime']:
+            return agg  # untouched since the last call
+
+        with open(self.outcomes_file, 'rb') as f:
+            if agg is not None and size <= agg['offset']:
+                agg = None  # truncated, or rewritten (modified without growing)
+            elif agg is not None:
+                # Trust the offset only if the bytes we already consumed are unchanged
+                tail = agg['tail']
+                f.seek(agg['offset'] - len(tail))
+                intact = f.read(len(tail)) == tail
+                if intact:
+                    f.seek(0)
+                    intact = f.readline() == agg['head']
+                if not intact:
+                    logger.info("outcomes.csv was rewritten; rebuilding performance aggregates")
+                    agg = None
+            if agg is None:
+                agg = {
+                    'offset': 0, 'mtime': 0, 'header': None, 'head': b'', 'tail': b'',
+                    'total_trades': 0, 'wins': 0, 'losses': 0, 'total_pnl': 0.0,
+                    'by_city': defaultdict(lambda: {'wins': 0, 'losses': 0, 'pnl': 0.0, 'err_sum': 0.0, 'err_count': 0}),
+                }
+                self._report_agg = agg
+            f.seek(agg['offset'])
+            data = f.read()
+        agg['mtime'] = st.st_mtime_ns
+        # Only consume complete lines; a partially flushed row is picked up next time
+        end = data.rfind(b'\n') + 1
+        if end == 0:
+            return agg
+        agg['offset'] += end
+        # Last consumed row (with its newline), checked against the file on the next call
+        agg['tail'] = data[data.rfind(b'\n', 0, end - 1) + 1:end]
+        if not agg['head']:
+            agg['head'] = data[:data.index(b'\n') + 1]
+
+        reader = csv.reader(io.StringIO(data[:end].decode('utf-8'), newline=''))
+        if agg['header'] is None:
+            agg['header'] = next(reader, None) or []
+        header = agg['header']
+        city_idx = header.index('city')
+        won_idx = header.index('won')
+        pnl_idx = header.index('profit_loss')
+        err_idx = header.index('forecast_error')
+        by_city = agg['by_city']
+        for row in reader:
+            if len(row) < len(header):
+                continue
+            agg['total_trades'] += 1
+            stats = by_city[row[city_idx]]
+            won = row[won_idx]
+            if won == 'YES':
+                agg['wins'] += 1
+                stats['wins'] += 1
+            else:
+                if won == 'NO':
+                    agg['losses'] += 1
+                stats['losses'] += 1
+
+            if row[pnl_idx]:
+                pnl = float(row[pnl_idx])
+                agg['total_pnl'] += pnl
+                stats['pnl'] += pnl
+
+            if row[err_idx]:
+                stats['err_sum'] += float(row[err_idx])
+                stats['err_count'] += 1
+        return agg
+
+    @staticmethod
+    def _report_digest(report: Dict) -> str:
+        """Digest of a performance report's contents, ignoring generated_at"""
+        payload = json.dumps({k: v for k, v in report.items() if k != 'generated_at'}, sort_keys=True)
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
     def generate_performance_report(self) -> Dict:
         """
         Generate performance analytics from outcomes
@@ -487,39 +680,18 @@ class OutcomeTracker:
             if not self.outcomes_file.exists():
                 return {}
             
-            # Read all outcomes
-            outcomes = []
-            with open(self.outcomes_file, 'r') as f:
-                reader = csv.DictReader(f)
-                outcomes = list(reader)
-            
-            if not outcomes:
+            agg = self._update_report_aggregates()
+            total_trades = agg['total_trades']
+            wins = agg['wins']
+            losses = agg['losses']
+            total_pnl = agg['total_pnl']
+            by_city = agg['by_city']
+
+            if not total_trades:
                 return {"message": "No settled positions yet"}
-            
-            # Calculate overall stats
-            total_trades = len(outcomes)
-            wins = sum(1 for o in outcomes if o['won'] == 'YES')
-            losses = sum(1 for o in outcomes if o['won'] == 'NO')
-            win_rate = wins / total_trades if total_trades > 0 else 0
-            
-            total_pnl = sum(float(o['profit_loss']) for o in outcomes if o['profit_loss'])
-            
-            # Stats by city
-            by_city = defaultdict(lambda: {'wins': 0, 'losses': 0, 'pnl': 0.0, 'forecast_errors': []})
-            
-            for outcome in outcomes:
-                city = outcome['city']
-                if outcome['won'] == 'YES':
-                    by_city[city]['wins'] += 1
-                else:
-                    by_city[city]['losses'] += 1
-                
-                if outcome['profit_loss']:
-                    by_city[city]['pnl'] += float(outcome['profit_loss'])
-                
-                if outcome['forecast_error']:
-                    by_city[city]['forecast_errors'].append(float(outcome['forecast_error']))
-            
+
+            win_rate = wins / total_trades
+
             # Calculate average forecast error per city
             city_stats = {}
             for city, stats in by_city.items():
@@ -528,7 +700,7 @@ class OutcomeTracker:
                     'trades': total,
                     'win_rate': stats['wins'] / total if total > 0 else 0,
                     'pnl': stats['pnl'],
-                    'avg_forecast_error': sum(stats['forecast_errors']) / len(stats['forecast_errors']) if stats['forecast_errors'] else None
+                    'avg_forecast_error': stats['err_sum'] / stats['err_count'] if stats['err_count'] else None
                 }
             
             report = {
@@ -543,9 +715,18 @@ class OutcomeTracker:
                 'by_city': city_stats
             }
             
-            # Save to JSON
-            with open(self.performance_file, 'w') as f:
-                json.dump(report, f, indent=2)
+            # Save to JSON only when the stats changed (generated_at excluded from the digest)
+            digest = self._report_digest(report)
+            if self._last_report_digest is None and self.performance_file.exists():
+                try:
+                    with open(self.performance_file, 'r') as f:
+                        self._last_report_digest = self._report_digest(json.load(f))
+                except (OSError, ValueError):
+                    pass
+            if digest != self._last_report_digest:
+                with open(self.performance_file, 'w') as f:
+                    json.dump(report, f, separators=(',', ':'))
+                self._last_report_digest = digest
             
             return report
         
@@ -660,15 +841,16 @@ class OutcomeTracker:
         except Exception as e:
             logger.error(f"Error reconciling with Kalshi: {e}", exc_info=True)
 
-    def run_outcome_check(self):
+    def run_outcome_check(self, tickers: Optional[set] = None):
         """
         Main method to check for settled positions and log outcomes.
-        Should be called periodically (e.g., once per hour).
+        Should be called periodically (e.g., once per hour), or with tickers
+        when settlements are pushed over WebSocket.
         Returns list of settlement result dicts (ticker, won, pnl, signed_pnl).
         """
         logger.info("🔍 Checking for settled positions...")
 
-        settled = self.check_settled_positions()
+        settled = self.check_settled_positions(tickers)
 
         if not settled:
             logger.info("No new settled positions found")
@@ -676,11 +858,25 @@ class OutcomeTracker:
 
         logger.info(f"Found {len(settled)} settled position(s) to process")
 
+        # Fetch observations/forecasts for all positions in parallel; the
+        # state updates and CSV writes below stay serial
+        with ThreadPoolExecutor(max_workers=min(8, len(settled))) as executor:
+            outcomes = list(executor.map(self._compute_outcome, settled))
+
         results = []
-        for position in settled:
-            result = self.log_outcome(position)
-            if result:
-                results.append(result)
+        batch_ts = datetime.now().isoformat()
+        # One buffered append handle for the whole batch; flushed once at the end
+        with open(self.outcomes_file, 'a', newline='', buffering=1 << 16) as f:
+            writer = csv.writer(f)
+            for position, outcome in zip(settled, outcomes):
+                result = self.log_outcome(position, writer, timestamp=batch_ts, outcome=outcome)
+                if result:
+                    results.append(result)
+            f.flush()
+
+        # Settlement divergence writes are batched; persist this batch now
+        if self.settlement_tracker:
+            self.settlement_tracker.flush()
 
         # Generate updated performance report
         report = self.generate_performance_report()
@@ -14,13 +14,16 @@ Key concepts:
 - Opposite positions can hedge each other
 """
 
+import functools
 import math
+import time
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
-from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Tuple
 import logging
 import re
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 
@@ -42,6 +45,64 @@ CITY_CORRELATIONS = {
     ('NY', 'DEN'): 0.3,   # Both cold but different regions
 }
 
+# Climate-cluster membership as a bitmask per city (one bit per cluster);
+# two cities share a cluster iff their masks AND to non-zero
+_CLUSTER_MASK: Dict[str, int] = {}
+for _bit, _cities in enumerate(CLIMATE_CLUSTERS.values()):
+    for _a in _cities:
+        _CLUSTER_MASK[_a] = _CLUSTER_MASK.get(_a, 0) | (1 << _bit)
+
+# Different-city base correlation for every ordered pair: explicit CITY_CORRELATIONS
+# entries (both directions), else 0.2 for cities sharing a climate cluster
+_PAIR_CORR: Dict[Tuple[str, str], float] = {}
+for (_a, _b), _corr in CITY_CORRELATIONS.items():
+    _PAIR_CORR[(_a, _b)] = _PAIR_CORR[(_b, _a)] = _corr
+for _a, _mask_a in _CLUSTER_MASK.items():
+    for _b, _mask_b in _CLUSTER_MASK.items():
+        if _a != _b and _mask_a & _mask_b:
+            _PAIR_CORR.setdefault((_a, _b), 0.2)
+del _bit, _cities, _a, _b, _corr, _mask_a, _mask_b
+
+# Binary option volatility sqrt(p * (1-p)) for every whole-cent price 0-100
+_VOL_TABLE = [math.sqrt((i / 100) * (1 - i / 100)) for i in range(101)]
+
+# Kalshi weather ticker, e.g. KXHIGHNY-26FEB04-B75.5 -> (HIGH, NY, 26FEB04, B, 75.5)
+_TICKER_RE = re.compile(r'KX(HIGH|LOW)(\w+)-(\w+)-([BT])(\d+\.?\d*)')
+
+
+class ParsedTicker(NamedTuple):
+    """Fields of a Kalshi weather ticker; all None if the ticker doesn't match."""
+    city: Optional[str]
+    market_type: Optional[str]  # HIGH or LOW
+    date: Optional[str]  # e.g. 26FEB04
+    threshold_type: Optional[str]  # B or T
+    threshold: Optional[float]
+
+
+_UNPARSED = ParsedTicker(None, None, None, None, None)
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_ticker(ticker: str) -> ParsedTicker:
+    """
+    Parse ticker into a ParsedTicker (city, market_type, date, threshold_type, threshold).
+
+    Memoized since the same tickers are parsed for every position pair; the
+    result is an immutable NamedTuple so cached values can be shared safely.
+    """
+    match = _TICKER_RE.match(ticker)
+    if not match:
+        return _UNPARSED
+    return ParsedTicker(match.group(2), match.group(1), match.group(3), match.group(4), float(match.group(5)))
+
+
+def parse_tickers_batch(tickers: List[str]) -> List[ParsedTicker]:
+    """
+    Parse many tickers at once. map() over the C-level lru_cache wrapper keeps
+    the per-ticker dispatch out of the interpreter; repeats are cache hits.
+    """
+    return list(map(parse_ticker, tickers))
+
 
 class PositionCorrelation:
     """
@@ -56,25 +117,9 @@ class PositionCorrelation:
         self.city_correlations = CITY_CORRELATIONS
         self.climate_clusters = CLIMATE_CLUSTERS
 
-    def parse_ticker(self, ticker: str) -> Dict:
-        """Parse ticker into components"""
-        result = {
-            'city': None,
-            'market_type': None,  # HIGH or LOW
-            'date': None,
-            'threshold_type': None,  # B or T
-            'threshold': None
-        }
-
-        match = re.match(r'KX(HIGH|LOW)(\w+)-(\w+)-([BT])(\d+\.?\d*)', ticker)
-        if match:
-            result['market_type'] = match.group(1)
-            result['city'] = match.group(2)
-            result['date'] = match.group(3)
-            result['threshold_type'] = match.group(4)
-            result['threshold'] = float(match.group(5))
-
-        return result
+    def parse_ticker(self, ticker: str) -> ParsedTicker:
+        """Parse ticker into a ParsedTicker (city, market_type, date, threshold_type, threshold)"""
+        return parse_ticker(ticker)
 
     def calculate_correlation(self, pos1: Dict, pos2: Dict) -> float:
         """
@@ -87,72 +132,68 @@ class PositionCorrelation:
         Returns:
             Correlation coefficient (-1 to 1)
         """
-        parsed1 = self.parse_ticker(pos1.get('ticker', ''))
-        parsed2 = self.parse_ticker(pos2.get('ticker', ''))
-
-        if not parsed1['city'] or not parsed2['city']:
+        ticker1 = pos1.get('ticker', '')
+        ticker2 = pos2.get('ticker', '')
+        return self._correlation_from_parsed(
+            ticker1, parse_ticker(ticker1), pos1.get('side'),
+            ticker2, parse_ticker(ticker2), pos2.get('side'),
+        )
+
+    def _correlation_from_parsed(self, ticker1: str, parsed1: ParsedTicker, side1: Optional[str],
+                                 ticker2: str, parsed2: ParsedTicker, side2: Optional[str]) -> float:
+        """calculate_correlation on already-parsed tickers (symmetric in the two positions)"""
+        city1, market_type1, date1 = parsed1.city, parsed1.market_type, parsed1.date
+        city2, market_type2, date2 = parsed2.city, parsed2.market_type, parsed2.date
+
+        if not city1 or not city2:
             return 0.0
 
-        correlation = 0.0
-
         # Same ticker = perfect correlation
-        if pos1.get('ticker') == pos2.get('ticker'):
-            return 1.0 if pos1.get('side') == pos2.get('side') else -1.0
+        if ticker1 == ticker2:
+            return 1.0 if side1 == side2 else -1.0
 
         # Same city, same date = very high correlation
-        if parsed1['city'] == parsed2['city'] and parsed1['date'] == parsed2['date']:
+        if city1 == city2 and date1 == date2:
             base_corr = 0.9
 
             # Same market type (both HIGH or both LOW) = higher correlation
-            if parsed1['market_type'] == parsed2['market_type']:
+            if market_type1 == market_type2:
                 base_corr = 0.95
             else:
                 # HIGH and LOW in same city are negatively correlated
                 base_corr = -0.3
 
             # Adjust for direction (same side = positive, opposite = negative)
-            if pos1.get('side') != pos2.get('side'):
+            if side1 != side2:
                 base_corr = -base_corr
 
             return base_corr
 
         # Same city, different date = moderate correlation
-        if parsed1['city'] == parsed2['city']:
+        if city1 == city2:
             base_corr = 0.5
-            if pos1.get('side') != pos2.get('side'):
+            if side1 != side2:
                 base_corr = -base_corr
             return base_corr
 
-        # Different cities - check climate clusters
-        city1, city2 = parsed1['city'], parsed2['city']
-
-        # Direct city correlation lookup
-        key = tuple(sorted([city1, city2]))
-        if key in self.city_correlations:
-            base_corr = self.city_correlations[key]
-        else:
-            # Check climate clusters
-            base_corr = 0.0
-            for cluster_name, cities in self.climate_clusters.items():
-                if city1 in cities and city2 in cities:
-                    base_corr = 0.2  # Same cluster = some correlation
-                    break
+        # Different cities - direct city correlation, else shared climate cluster
+        base_corr = _PAIR_CORR.get((city1, city2), 0.0)
 
         # Same date increases correlation
-        if parsed1['date'] == parsed2['date']:
+        if date1 == date2:
             base_corr *= 1.5
 
         # Same market type increases correlation
-        if parsed1['market_type'] == parsed2['market_type']:
+        if market_type1 == market_type2:
             base_corr *= 1.2
 
         # Opposite sides reduce correlation
-        if pos1.get('side') != pos2.get('side'):
+        if side1 != side2:
             base_corr = -base_corr
 
         return max(-1, min(1, base_corr))  # Clamp to [-1, 1]
 
-    def build_correlation_matrix(self, positions: List[Dict]) -> List[List[float]]:
+    def build_correlation_matrix(self, positions: List[Dict]) -> np.ndarray:
         """
         Build correlation matrix for all positions
 
@@ -160,18 +201,65 @@ class PositionCorrelation:
             positions: List of position dicts
 
         Returns:
-            2D correlation matrix
+            n x n correlation matrix (float64 ndarray)
         """
-        n = len(positions)
-        matrix = [[0.0] * n for _ in range(n)]
+        return self.build_correlation_matrix_from_parsed(
+            positions, parse_tickers_batch([p.get('ticker', '') for p in positions])
+        )
 
-        for i in range(n):
-            for j in range(n):
-                if i == j:
-                    matrix[i][j] = 1.0
-                else:
-                    matrix[i][j] = self.calculate_correlation(positions[i], positions[j])
+    def build_correlation_matrix_from_parsed(self, positions: List[Dict],
+                                             parsed: List[ParsedTicker]) -> np.ndarray:
+        """
+        build_correlation_matrix with each position's ticker already parsed.
 
+        Vectorized form of _correlation_from_parsed: tickers, cities, dates, market
+        types and sides are encoded as integer codes and every pair is evaluated
+        with NumPy broadcasting instead of a Python double loop.
+        """
+        n = len(positions)
+        if n == 0:
+            return np.zeros((0, 0), dtype=np.float64)
+
+        def encode(values) -> np.ndarray:
+            codes = {}
+            return np.fromiter((codes.setdefault(v, len(codes)) for v in values), dtype=np.int32, count=n)
+
+        cities = [pt.city for pt in parsed]
+        city_codes = {}
+        for city in cities:
+            city_codes.setdefault(city, len(city_codes))
+        city_ids = np.fromiter((city_codes[c] for c in cities), dtype=np.int32, count=n)
+        # Different-city base correlation between city codes
+        pair_corr = np.array(
+            [[_PAIR_CORR.get((a, b), 0.0) for b in city_codes] for a in city_codes], dtype=np.float64
+        )
+
+        ticker_ids = encode(p.get('ticker', '') for p in positions)
+        side_ids = encode(p.get('side') for p in positions)
+        date_ids = encode(pt.date for pt in parsed)
+        type_ids = encode(pt.market_type for pt in parsed)
+        valid = np.fromiter((bool(c) for c in cities), dtype=bool, count=n)
+
+        same_ticker = ticker_ids[:, None] == ticker_ids[None, :]
+        same_city = city_ids[:, None] == city_ids[None, :]
+        same_date = date_ids[:, None] == date_ids[None, :]
+        same_type = type_ids[:, None] == type_ids[None, :]
+        sign = np.where(side_ids[:, None] == side_ids[None, :], 1.0, -1.0)
+
+        # Different cities: pair/cluster base, boosted for same date and same market type
+        cross = pair_corr[city_ids[:, None], city_ids[None, :]]
+        cross = np.where(same_date, cross * 1.5, cross)
+        cross = np.where(same_type, cross * 1.2, cross)
+        cross = np.clip(cross * sign, -1, 1)
+
+        matrix = np.select(
+            [same_ticker, same_city & same_date, same_city],
+            [sign, np.where(same_type, 0.95, -0.3) * sign, 0.5 * sign],
+            default=cross,
+        )
+        # Unparseable tickers are uncorrelated with everything but themselves
+        matrix[~(valid[:, None] & valid[None, :])] = 0.0
+        np.fill_diagonal(matrix, 1.0)
         return matrix
 
 
@@ -194,21 +282,32 @@ class PortfolioVaR:
         price = position.get('price', 50)
         count = position.get('count', 1)
 
-        # Binary option volatility: sqrt(p * (1-p))
-        p = price / 100.0
-        single_contract_vol = math.sqrt(p * (1 - p))
+        # Binary option volatility: sqrt(p * (1-p)), from the table for whole-cent prices.
+        # Live positions carry average cost (exposure / contracts), which may be fractional.
+        idx = int(price)
+        if idx == price and 0 <= idx <= 100:
+            single_contract_vol = _VOL_TABLE[idx]
+        else:
+            p = price / 100.0
+            single_contract_vol = math.sqrt(p * (1 - p))
 
         # Scale by position size
         return single_contract_vol * count
 
     def calculate_portfolio_var(self, positions: List[Dict],
-                                 confidence_level: float = 0.95) -> Dict:
+                                 confidence_level: float = 0.95,
+                                 corr_matrix: Optional[np.ndarray] = None,
+                                 parsed: Optional[List[ParsedTicker]] = None,
+                                 volatilities: Optional[np.ndarray] = None) -> Dict:
         """
         Calculate portfolio VaR using variance-covariance method
 
         Args:
             positions: List of position dicts with ticker, side, count, price
             confidence_level: VaR confidence level (e.g., 0.95 for 95% VaR)
+            corr_matrix: Precomputed correlation matrix (built if not given)
+            parsed: Precomputed parse_ticker results, used when building the matrix
+            volatilities: Precomputed per-position volatilities (computed if not given)
 
         Returns:
             Dict with VaR metrics
@@ -219,17 +318,22 @@ class PortfolioVaR:
         n = len(positions)
 
         # Calculate individual volatilities
-        volatilities = [self.calculate_position_volatility(p) for p in positions]
+        if volatilities is None:
+            volatilities = np.fromiter(
+                (self.calculate_position_volatility(p) for p in positions), dtype=np.float64, count=n
+            )
 
         # Build correlation matrix
-        corr_matrix = self.correlation_calc.build_correlation_matrix(positions)
+        if corr_matrix is None:
+            if parsed is None:
+                corr_matrix = self.correlation_calc.build_correlation_matrix(positions)
+            else:
+                corr_matrix = self.correlation_calc.build_correlation_matrix_from_parsed(positions, parsed)
 
         # Calculate portfolio variance
-        # Var(portfolio) = sum_i sum_j (vol_i * vol_j * corr_ij)
-        portfolio_variance = 0.0
-        for i in range(n):
-            for j in range(n):
-                portfolio_variance += volatilities[i] * volatilities[j] * corr_matrix[i][j]
+        # Var(portfolio) = sum_i sum_j (vol_i * vol_j * corr_ij) = vols' C vols
+        corr_vols = corr_matrix @ volatilities
+        portfolio_variance = float(volatilities @ corr_vols)
 
         portfolio_vol = math.sqrt(max(0, portfolio_variance))
 
@@ -246,23 +350,27 @@ class PortfolioVaR:
         es_95 = portfolio_vol * 2.063  # Approximate ES at 95%
 
         # Calculate individual contributions
-        marginal_vars = []
-        for i, pos in enumerate(positions):
-            # Marginal VaR = how much this position contributes to total VaR
-            marginal_var = 0.0
-            for j in range(n):
-                marginal_var += volatilities[i] * volatilities[j] * corr_matrix[i][j]
-
-            if portfolio_vol > 0:
-                marginal_var = (marginal_var / portfolio_vol) * z_95
-            else:
-                marginal_var = volatilities[i] * z_95
+        # Marginal VaR = how much this position contributes to total VaR
+        if portfolio_vol > 0:
+            marginal = (volatilities * corr_vols) / portfolio_vol * z_95
+        else:
+            marginal = volatilities * z_95
+
+        # Round whole arrays once rather than per element
+        marginal_rounded = np.round(marginal, 4).tolist()
+        if var_95 > 0:
+            pct_rounded = np.round(marginal / var_95 * 100, 1).tolist()
+        else:
+            pct_rounded = [0] * n
 
-            marginal_vars.append({
+        marginal_vars = [
+            {
                 'ticker': pos.get('ticker'),
-                'marginal_var': round(marginal_var, 4),
-                'pct_contribution': round(marginal_var / var_95 * 100, 1) if var_95 > 0 else 0
-            })
+                'marginal_var': marginal_var,
+                'pct_contribution': pct,
+            }
+            for pos, marginal_var, pct in zip(positions, marginal_rounded, pct_rounded)
+        ]
 
         return {
             'var_95': round(var_95, 4),
@@ -289,14 +397,27 @@ class CorrelationAwareRisk:
         self.max_correlated_exposure = 0.5  # Max 50% reduction for correlated positions
         self.correlation_threshold = 0.5  # Consider positions correlated above this
 
+        # Short-lived cache of get_current_positions() so several sizing decisions
+        # in one scan share a single API call; cleared by invalidate_positions()
+        self._pos_cache: Optional[List[Dict]] = None
+        self._pos_cache_ts = 0.0
+        self.pos_cache_ttl = 2.0  # seconds
+
+    def invalidate_positions(self):
+        """Drop cached positions (call after submitting an order)"""
+        self._pos_cache = None
+
     def get_current_positions(self) -> List[Dict]:
-        """Get current positions from client"""
+        """Get current positions from client (cached for pos_cache_ttl seconds)"""
         if not self.client:
             return []
 
+        if self._pos_cache is not None and time.monotonic() - self._pos_cache_ts < self.pos_cache_ttl:
+            return self._pos_cache
+
         try:
             positions = self.client.get_positions()
-            return [
+            self._pos_cache = [
                 {
                     'ticker': p.get('ticker'),
                     'side': 'yes' if p.get('position', 0) > 0 else 'no',
@@ -305,6 +426,8 @@ class CorrelationAwareRisk:
                 }
                 for p in positions if p.get('position', 0) != 0
             ]
+            self._pos_cache_ts = time.monotonic()
+            return self._pos_cache
         except Exception as e:
             logger.warning(f"Could not get positions: {e}")
             return []
@@ -332,14 +455,23 @@ class CorrelationAwareRisk:
                 'max_correlated_position': None
             }
 
-        new_position = {'ticker': new_ticker, 'side': new_side, 'count': new_count}
+        new_parsed = parse_ticker(new_ticker)
+        new_city = new_parsed.city
         total_correlation = 0
         correlated_contracts = 0
         max_correlation = 0
         max_correlated_position = None
 
         for pos in current_positions:
-            corr = self.correlation_calc.calculate_correlation(new_position, pos)
+            ticker = pos.get('ticker', '')
+            parsed = parse_ticker(ticker)
+            city = parsed.city
+            # Unparseable tickers and unrelated cities have zero correlation - skip the full rules
+            if not new_city or not city or (city != new_city and (new_city, city) not in _PAIR_CORR):
+                continue
+            corr = self.correlation_calc._correlation_from_parsed(
+                new_ticker, new_parsed, new_side, ticker, parsed, pos.get('side')
+            )
 
             if corr > self.correlation_threshold:
                 total_correlation += corr * pos['count']
@@ -402,36 +534,45 @@ class CorrelationAwareRisk:
         if not positions:
             return {'error': 'No positions found'}
 
-        # Calculate VaR
-        var_metrics = self.var_calc.calculate_portfolio_var(positions)
-
-        # Calculate correlation matrix summary
-        corr_matrix = self.correlation_calc.build_correlation_matrix(positions)
-
-        # Find highly correlated pairs
-        high_correlations = []
+        # Read each position dict once into parallel arrays shared by VaR and concentration
         n = len(positions)
-        for i in range(n):
-            for j in range(i + 1, n):
-                if abs(corr_matrix[i][j]) > 0.5:
-                    high_correlations.append({
-                        'pos1': positions[i]['ticker'],
-                        'pos2': positions[j]['ticker'],
-                        'correlation': round(corr_matrix[i][j], 2)
-                    })
+        parsed = parse_tickers_batch([p['ticker'] for p in positions])
+        counts = np.fromiter((p['count'] for p in positions), dtype=np.float64, count=n)
+        prices = np.fromiter((p.get('price', 50) for p in positions), dtype=np.float64, count=n)
+        corr_matrix = self.correlation_calc.build_correlation_matrix_from_parsed(positions, parsed)
+
+        # Calculate VaR (binary option volatility sqrt(p * (1-p)) scaled by contracts)
+        p = prices / 100.0
+        volatilities = np.sqrt(p * (1 - p)) * counts
+        var_metrics = self.var_calc.calculate_portfolio_var(
+            positions, corr_matrix=corr_matrix, volatilities=volatilities
+        )
+
+        # Find highly correlated pairs (upper triangle, row-major order)
+        high_correlations = []
+        for i, j in np.argwhere(np.triu(np.abs(corr_matrix), 1) > 0.5).tolist():
+            high_correlations.append({
+                'pos1': positions[i]['ticker'],
+                'pos2': positions[j]['ticker'],
+                'correlation': round(float(corr_matrix[i, j]), 2)
+            })
 
         # Group by city for concentration analysis
-        by_city = defaultdict(lambda: {'count': 0, 'exposure': 0})
-        for pos in positions:
-            parsed = self.correlation_calc.parse_ticker(pos['ticker'])
-            city = parsed.get('city', 'Unknown')
-            by_city[city]['count'] += pos['count']
-            by_city[city]['exposure'] += pos['count'] * pos.get('price', 50) / 100
+        city_codes = {}
+        city_ids = np.fromiter(
+            (city_codes.setdefault(pt.city, len(city_codes)) for pt in parsed), dtype=np.intp, count=n
+        )
+        city_counts = np.bincount(city_ids, weights=counts).tolist()
+        city_exposures = np.bincount(city_ids, weights=counts * prices / 100).tolist()
+        by_city = {
+            city: {'count': int(city_counts[k]), 'exposure': city_exposures[k]}
+            for city, k in city_codes.items()
+        }
 
         return {
             'var_metrics': var_metrics,
             'high_correlations': high_correlations,
-            'concentration_by_city': dict(by_city),
+            'concentration_by_city': by_city,
             'total_positions': len(positions),
             'recommendations': self._generate_recommendations(positions, var_metrics, high_correlations)
         }
@@ -10,6 +10,7 @@ Generates a detailed post-mortem for every settlement, recording:
 Stored as JSONL in data/postmortems.jsonl (one JSON object per line).
 """
 
+import atexit
 import csv
 import json
 import logging
@@ -17,11 +18,40 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 
+import numpy as np
+
 from .config import Config
 
 logger = logging.getLogger(__name__)
 
 
+def _json_default(obj):
+    """Encode NumPy scalars (e.g. bias-corrected temps) as plain Python numbers."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+# orjson is optional — faster encode/decode when installed, stdlib json otherwise.
+# Both paths produce bytes so store() can write to a binary handle, and both share
+# _json_default so the file content doesn't depend on which one is installed.
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, default=_json_default, option=orjson.OPT_APPEND_NEWLINE)
+
+    _loads = orjson.loads
+    _DecodeError = orjson.JSONDecodeError
+except ImportError:
+    def _dumps(obj) -> bytes:
+        return (json.dumps(obj, default=_json_default, separators=(',', ':'),
+                           ensure_ascii=False) + '\n').encode()
+
+    _loads = json.loads
+    _DecodeError = json.JSONDecodeError
+
+
 class PostMortemGenerator:
     """Generate and store structured post-mortem analysis for settled trades."""
 
@@ -29,6 +59,11 @@ class PostMortemGenerator:
         self.output_file = Path("data/postmortems.jsonl")
         self.output_file.parent.mkdir(exist_ok=True)
         self.source_forecasts_file = Path("data/source_forecasts.csv")
+        # source_forecasts.csv indexed by market_ticker and series_ticker, reloaded on mtime change
+        self._forecasts_cache = None
+        self._forecasts_mtime = 0.0
+        # Unbuffered binary append handle, opened on first store() and kept for the process
+        self._fh = None
 
     def generate(self, market_ticker: str, trade_details: dict, outcome_data: dict,
                  source_forecasts: Optional[List[dict]] = None) -> dict:
@@ -110,8 +145,11 @@ class PostMortemGenerator:
     def store(self, postmortem: dict):
         """Append post-mortem to JSONL file."""
         try:
-            with open(self.output_file, 'a') as f:
-                f.write(json.dumps(postmortem) + '\n')
+            if self._fh is None:
+                self._fh = open(self.output_file, 'ab', buffering=0)
+                atexit.register(self._fh.close)
+            # One write per record (newline included) so lines never interleave
+            self._fh.write(_dumps(postmortem))
             logger.debug(f"Stored post-mortem for {postmortem.get('market_ticker', '?')}")
         except Exception as e:
             logger.warning(f"Could not store post-mortem: {e}")
@@ -126,31 +164,64 @@ class PostMortemGenerator:
         Returns:
             List of post-mortem dicts, most recent first
         """
-        if not self.output_file.exists():
+        if limit <= 0 or not self.output_file.exists():
             return []
 
+        city_upper = city.upper() if city else None
         postmortems = []
         try:
-            with open(self.output_file, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        pm = json.loads(line)
-                        if city:
-                            ticker = pm.get('market_ticker', '')
-                            if city.upper() not in ticker.upper():
-                                continue
-                        postmortems.append(pm)
-                    except json.JSONDecodeError:
-                        continue
+            # Walk the file tail-first so we stop after `limit` matches
+            for line in _iter_lines_reverse(self.output_file):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    pm = _loads(line)
+                except _DecodeError:
+                    continue
+                if city_upper and city_upper not in pm.get('market_ticker', '').upper():
+                    continue
+                postmortems.append(pm)
+                if len(postmortems) >= limit:
+                    break
         except Exception as e:
             logger.warning(f"Error loading post-mortems: {e}")
 
-        # Most recent first, limited
-        postmortems.reverse()
-        return postmortems[:limit]
+        return postmortems
+
+    def _load_forecasts(self):
+        """Return (by_market, by_series) indexes of source_forecasts.csv, rereading only when it changed.
+
+        Each index maps a ticker to a list of (row_number, {source, temperature}) so
+        lookups can merge both indexes back into file order.
+        """
+        mtime = self.source_forecasts_file.stat().st_mtime
+        if self._forecasts_cache is not None and mtime == self._forecasts_mtime:
+            return self._forecasts_cache
+
+        by_market: Dict[str, list] = {}
+        by_series: Dict[str, list] = {}
+        with open(self.source_forecasts_file, 'r', newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            # Missing columns point one past the header; rows are padded so that slot reads ''
+            width = len(header)
+            col = {name: i for i, name in enumerate(header)}
+            mt_i, st_i, src_i, temp_i = (col.get(name, width) for name in
+                                         ('market_ticker', 'series_ticker', 'source', 'temperature'))
+            for n, row in enumerate(reader):
+                if len(row) <= width:
+                    row += [''] * (width + 1 - len(row))
+                entry = (n, {
+                    'source': row[src_i],
+                    'temperature': _safe_float(row[temp_i]),
+                })
+                by_market.setdefault(row[mt_i], []).append(entry)
+                by_series.setdefault(row[st_i], []).append(entry)
+
+        self._forecasts_cache = (by_market, by_series)
+        self._forecasts_mtime = mtime
+        return self._forecasts_cache
 
     def _lookup_source_forecasts(self, market_ticker: str) -> List[dict]:
         """Look up per-source forecast data for a market ticker.
@@ -161,19 +232,47 @@ class PostMortemGenerator:
         if not self.source_forecasts_file.exists():
             return []
 
-        results = []
         try:
-            with open(self.source_forecasts_file, 'r') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row.get('market_ticker', '') == market_ticker or row.get('series_ticker', '') in market_ticker:
-                        results.append({
-                            'source': row.get('source', ''),
-                            'temperature': _safe_float(row.get('temperature', '')),
-                        })
+            by_market, by_series = self._load_forecasts()
         except Exception:
-            pass
-        return results
+            return []
+
+        # Rows match on exact market_ticker or when their series_ticker is a substring
+        matched = dict(by_market.get(market_ticker, ()))
+        for series_ticker, entries in by_series.items():
+            if series_ticker in market_ticker:
+                matched.update(entries)
+        return [matched[n].copy() for n in sorted(matched)]
+
+
+# Global instance
+_postmortem_generator = None
+
+
+def get_postmortem_generator() -> PostMortemGenerator:
+    """Get global post-mortem generator instance (shares one open JSONL handle)"""
+    global _postmortem_generator
+    if _postmortem_generator is None:
+        _postmortem_generator = PostMortemGenerator()
+    return _postmortem_generator
+
+
+def _iter_lines_reverse(path: Path, chunk: int = 8192):
+    """Yield the lines of a file as bytes, last line first, reading backwards in chunks."""
+    with open(path, 'rb') as f:
+        f.seek(0, 2)
+        pos = f.tell()
+        tail = b''
+        while pos > 0:
+            step = min(chunk, pos)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + tail).split(b'\n')
+            # First piece may be a partial line continuing in the previous chunk
+            tail = lines.pop(0)
+            for line in reversed(lines):
+                yield line
+        yield tail
 
 
 def _safe_float(val) -> Optional[float]:
@@ -6,51 +6,214 @@ the actual binary outcome. Tracks mean divergence and stddev per city to
 detect systematic forecast biases and adjust confidence accordingly.
 """
 
+import atexit
+import io
 import json
 import logging
 import math
+import os
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
-from collections import defaultdict
+from collections import defaultdict, deque
+from functools import partial
 
 logger = logging.getLogger(__name__)
 
+# orjson is optional — faster state (de)serialization when installed, stdlib json otherwise
+try:
+    import orjson
+
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode()
+
+    _loads = json.loads
+
+
+# Settlements kept per city (oldest dropped first) to prevent unbounded growth
+_MAX_RECORDS = 200
+
+# One generate_report() block per city
+_REPORT_CITY_TEMPLATE = (
+    "{city}: {n_records} settlements\n"
+    "  Mean divergence: {mean_divergence:+.3f} ({direction})\n"
+    "  Std divergence:  {std_divergence:.3f}\n"
+    "  Confidence adj:  {confidence_adjustment:.2f}x\n"
+)
+
+
+def _to_epoch(ts) -> int:
+    """Normalize a stored timestamp to epoch seconds (older state files used ISO strings)."""
+    if isinstance(ts, (int, float)):
+        return int(ts)
+    try:
+        return int(datetime.fromisoformat(ts).timestamp())
+    except (TypeError, ValueError):
+        return 0
+
 
 class SettlementTracker:
     """Track forecast vs outcome divergence per city."""
 
     def __init__(self, state_path: str = "data/settlement_divergence.json"):
-        self.state_file = Path(state_path)
-        self.state_file.parent.mkdir(exist_ok=True)
+        # One shard per city under data/settlement_divergence/ so a settlement only
+        # rewrites its own city's file; state_path itself is the pre-sharding file
+        self.legacy_state_file = Path(state_path)
+        self.state_dir = self.legacy_state_file.with_suffix('')
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+
+        # Per-city parallel ring buffers (one entry per settlement, oldest first);
+        # appending to a full buffer drops its oldest entry in O(1)
+        ring = partial(deque, maxlen=_MAX_RECORDS)
+        self.probs = defaultdict(ring)  # our probability for the traded side
+        self.wons = defaultdict(ring)  # 1 if won, 0 if lost
+        self.tickers = defaultdict(ring)
+        self.timestamps = defaultdict(ring)  # POSIX epoch seconds
+        # {city: [n, mean, M2]} — running Welford stats of the divergences in the window
+        self._stats = {}
+        # {city: (n_records, stats)} — get_city_divergence results, dropped on each new settlement
+        self._div_cache = {}
+
+        # Batch state writes: flush every _flush_every settlements or _flush_interval seconds
+        self._dirty_cities = set()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self._flush_interval = 5.0
+        self._flush_every = 20
+
+        # Batched flushes run on a background writer thread (started on first use) so
+        # record_settlement never waits on disk. _lock guards the record buffers against
+        # the writer's snapshot; _write_lock serializes writers (thread vs. explicit flush).
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._save_event = threading.Event()
+        self._writer = None
 
-        # {city: [{'prob': float, 'won': bool, 'ticker': str, 'timestamp': str}, ...]}
-        self.records = defaultdict(list)
         self._load_state()
+        atexit.register(self.flush)
 
     def _load_state(self):
-        if not self.state_file.exists():
-            return
         try:
-            with open(self.state_file, 'r') as f:
-                data = json.load(f)
-            for city, records in data.get('records', {}).items():
-                self.records[city] = records
-            total = sum(len(v) for v in self.records.values())
+            shards = sorted(self.state_dir.glob('*.json'))
+            if shards:
+                for shard in shards:
+                    data = _loads(shard.read_bytes())
+                    city = shard.stem
+                    self.probs[city].extend(data['probs'])
+                    self.wons[city].extend(data['wons'])
+                    self.tickers[city].extend(data['tickers'])
+                    self.timestamps[city].extend(map(_to_epoch, data['timestamps']))
+            elif self.legacy_state_file.exists():
+                self._load_legacy_state()
+                # Write every city out as a shard on the next flush
+                self._dirty_cities.update(self.probs)
+            for city, probs in self.probs.items():
+                for prob, won in zip(probs, self.wons[city]):
+                    self._stats_add(city, prob - won)
+            total = sum(len(v) for v in self.probs.values())
             if total > 0:
-                logger.info(f"📊 Settlement tracker: {total} records across {len(self.records)} cities")
+                logger.info(f"📊 Settlement tracker: {total} records across {len(self.probs)} cities")
         except Exception as e:
             logger.warning(f"Could not load settlement tracker state: {e}")
 
-    def _save_state(self):
-        try:
-            data = {
-                'records': dict(self.records),
-                'updated_at': datetime.now().isoformat(),
+    def _load_legacy_state(self):
+        """Load the single-file state written before per-city sharding."""
+        data = _loads(self.legacy_state_file.read_bytes())
+        if 'probs' in data:
+            for city, probs in data['probs'].items():
+                self.probs[city].extend(probs)
+                self.wons[city].extend(data['wons'][city])
+                self.tickers[city].extend(data['tickers'][city])
+                self.timestamps[city].extend(map(_to_epoch, data['timestamps'][city]))
+        else:
+            # Oldest state files stored a list of record dicts per city
+            for city, records in data.get('records', {}).items():
+                for r in records:
+                    self._append(city, r['prob'], r['won'], r.get('ticker', ''),
+                                 _to_epoch(r.get('timestamp', '')))
+
+    def _snapshot_dirty(self) -> dict:
+        """Copy the dirty cities' records (under the lock) and reset the batch counters."""
+        with self._lock:
+            updated_at = datetime.now().isoformat()
+            snapshot = {
+                city: {
+                    'probs': list(self.probs[city]),
+                    'wons': list(self.wons[city]),
+                    'tickers': list(self.tickers[city]),
+                    'timestamps': list(self.timestamps[city]),
+                    'updated_at': updated_at,
+                }
+                for city in self._dirty_cities
             }
-            with open(self.state_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            self._dirty_cities.clear()
+            self._pending = 0
+            self._last_flush = time.monotonic()
+        return snapshot
+
+    def _save_city(self, city: str, data: dict):
+        try:
+            # Serialize in memory, write once to a temp file, then atomically swap it
+            # in so a crash mid-write can never leave a truncated state file
+            payload = _dumps(data)
+            path = self.state_dir / f"{city}.json"
+            tmp = path.with_suffix('.json.tmp')
+            tmp.write_bytes(payload)
+            os.replace(tmp, path)
         except Exception as e:
-            logger.warning(f"Could not save settlement tracker state: {e}")
+            logger.warning(f"Could not save settlement tracker state for {city}: {e}")
+
+    def flush(self):
+        """Write cities with pending settlements to disk now (no-op if nothing changed)."""
+        with self._write_lock:
+            for city, data in self._snapshot_dirty().items():
+                self._save_city(city, data)
+
+    def _writer_loop(self):
+        while True:
+            self._save_event.wait()
+            self._save_event.clear()
+            self.flush()
+
+    def _request_flush(self):
+        """Wake the background writer; repeated requests before it runs coalesce."""
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._writer_loop, name="settlement-tracker-writer",
+                                            daemon=True)
+            self._writer.start()
+        self._save_event.set()
+
+    def _append(self, city: str, prob: float, won: bool, ticker: str, timestamp: int):
+        self.probs[city].append(prob)
+        self.wons[city].append(1 if won else 0)
+        self.tickers[city].append(ticker)
+        self.timestamps[city].append(timestamp)
+
+    def _stats_add(self, city: str, x: float):
+        """Welford update: add divergence x to the city's running stats."""
+        st = self._stats.get(city)
+        if st is None:
+            st = self._stats[city] = [0, 0.0, 0.0]
+        st[0] += 1
+        delta = x - st[1]
+        st[1] += delta / st[0]
+        st[2] += delta * (x - st[1])
+
+    def _stats_remove(self, city: str, x: float):
+        """Reverse Welford update: drop divergence x (evicted from the window)."""
+        st = self._stats[city]
+        n = st[0] - 1
+        if n == 0:
+            st[:] = [0, 0.0, 0.0]
+            return
+        delta = x - st[1]
+        mean = st[1] - delta / n
+        st[2] -= delta * (x - mean)
+        st[0], st[1] = n, mean
 
     def record_settlement(self, city: str, our_probability: float, won: bool,
                           ticker: str = ''):
@@ -63,18 +226,22 @@ class SettlementTracker:
             won: Whether we won the trade
             ticker: Market ticker for reference
         """
-        self.records[city].append({
-            'prob': our_probability,
-            'won': won,
-            'ticker': ticker,
-            'timestamp': datetime.now().isoformat(),
-        })
+        with self._lock:
+            # A full window drops its oldest settlement on append; take it out of the stats first
+            probs = self.probs[city]
+            if len(probs) == _MAX_RECORDS:
+                self._stats_remove(city, probs[0] - self.wons[city][0])
 
-        # Keep only last 200 records per city to prevent unbounded growth
-        if len(self.records[city]) > 200:
-            self.records[city] = self.records[city][-200:]
+            self._append(city, our_probability, won, ticker, int(time.time()))
+            self._stats_add(city, our_probability - (1.0 if won else 0.0))
+            self._div_cache.pop(city, None)
 
-        self._save_state()
+            self._dirty_cities.add(city)
+            self._pending += 1
+            flush_due = (self._pending >= self._flush_every
+                         or time.monotonic() - self._last_flush > self._flush_interval)
+        if flush_due:
+            self._request_flush()
 
     def get_city_divergence(self, city: str) -> dict:
         """
@@ -83,26 +250,24 @@ class SettlementTracker:
         Returns:
             dict with mean_divergence, std_divergence, n_records, confidence_adjustment
         """
-        records = self.records.get(city, [])
-        if len(records) < 5:
+        n = len(self.probs.get(city, ()))
+        cached = self._div_cache.get(city)
+        if cached and cached[0] == n:
+            return cached[1]
+        if n < 5:
             return {
                 'mean_divergence': 0.0,
                 'std_divergence': 0.0,
-                'n_records': len(records),
+                'n_records': n,
                 'confidence_adjustment': 1.0,
             }
 
         # Divergence = our_probability - actual_outcome (1 if won, 0 if lost)
         # Positive divergence = we're systematically overconfident
         # Negative divergence = we're systematically underconfident
-        divergences = []
-        for r in records:
-            actual = 1.0 if r['won'] else 0.0
-            divergences.append(r['prob'] - actual)
-
-        mean_div = sum(divergences) / len(divergences)
-        variance = sum((d - mean_div) ** 2 for d in divergences) / len(divergences)
-        std_div = math.sqrt(variance)
+        # Maintained incrementally by record_settlement (Welford)
+        _, mean_div, m2 = self._stats[city]
+        std_div = math.sqrt(max(0.0, m2 / n))
 
         # Confidence adjustment: if mean divergence is significantly positive
         # (overconfident), reduce confidence. Range: [0.5, 1.0]
@@ -112,32 +277,33 @@ class SettlementTracker:
         else:
             adjustment = 1.0
 
-        return {
+        stats = {
             'mean_divergence': mean_div,
             'std_divergence': std_div,
-            'n_records': len(records),
+            'n_records': n,
             'confidence_adjustment': adjustment,
         }
+        self._div_cache[city] = (n, stats)
+        return stats
 
     def get_all_divergences(self) -> dict:
         """Get divergence stats for all cities."""
-        return {city: self.get_city_divergence(city) for city in self.records}
+        return {city: self.get_city_divergence(city) for city in self.probs}
 
     def generate_report(self) -> str:
         """Generate human-readable divergence report."""
-        lines = ["Settlement Divergence Report", "=" * 40, ""]
+        header = "Settlement Divergence Report\n" + "=" * 40 + "\n"
 
-        if not self.records:
-            lines.append("No settlement data yet.")
-            return "\n".join(lines)
+        if not self.probs:
+            return header + "\nNo settlement data yet."
 
-        for city in sorted(self.records.keys()):
+        buf = io.StringIO()
+        w = buf.write
+        w(header)
+        for city in sorted(self.probs.keys()):
             stats = self.get_city_divergence(city)
             direction = "overconfident" if stats['mean_divergence'] > 0 else "underconfident"
-            lines.append(f"{city}: {stats['n_records']} settlements")
-            lines.append(f"  Mean divergence: {stats['mean_divergence']:+.3f} ({direction})")
-            lines.append(f"  Std divergence:  {stats['std_divergence']:.3f}")
-            lines.append(f"  Confidence adj:  {stats['confidence_adjustment']:.2f}x")
-            lines.append("")
+            w("\n")
+            w(_REPORT_CITY_TEMPLATE.format(city=city, direction=direction, **stats))
 
-        return "\n".join(lines)
+        return buf.getvalue()
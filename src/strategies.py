@@ -1,8 +1,16 @@
+import atexit
 import csv
-
+import functools
+import queue
+import re
+import subprocess
+import sys
+import threading
+import time
 import uuid
 import logging
 import numpy as np
+from collections import defaultdict
 from pathlib import Path
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
@@ -15,10 +23,18 @@ from .backtester import get_data_store
 
 logger = logging.getLogger(__name__)
 
+# Month abbreviations used in tickers (26JAN28) and market titles ("Jan 28, 2026")
+_MONTH_MAP = {'JAN': 1, 'FEB': 2, 'MAR': 3, 'APR': 4, 'MAY': 5, 'JUN': 6,
+              'JUL': 7, 'AUG': 8, 'SEP': 9, 'OCT': 10, 'NOV': 11, 'DEC': 12}
+
+# Title date formats for _extract_market_date, tried in order
+_DATE_RE_MONTH = re.compile(r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(\d{1,2}),\s+(\d{4})',
+                            re.IGNORECASE)  # "Jan 28, 2026"
+_DATE_RE_NUM = re.compile(r'(\d{1,2})[/-](\d{1,2})[/-](\d{4})')  # "01/28/2026" or "01-28-2026"
+
 
 def _parse_date_from_ticker(ticker: str) -> str:
     """Extract ISO date from ticker like KXHIGHCHI-26FEB16-T60 → '2026-02-16'."""
-    import re
     parts = ticker.split('-')
     if len(parts) < 2:
         return ''
@@ -34,6 +50,277 @@ def _parse_date_from_ticker(ticker: str) -> str:
     return f'20{yy}-{mm}-{dd}'
 
 
+# Desktop notifications only exist on macOS; elsewhere send_notification is a no-op
+_IS_MACOS = sys.platform == 'darwin'
+_osascript_proc = None
+_osascript_lock = threading.Lock()
+
+
+def _applescript_quote(text: str) -> str:
+    """Quote text as an AppleScript string literal (escapes backslashes, quotes, newlines)."""
+    text = text.replace('\\', '\\\\').replace('"', '\\"')
+    return '"' + text.replace('\r', '').replace('\n', '\\n') + '"'
+
+
+def send_notification(title: str, message: str):
+    """Send a macOS notification through one long-lived interactive osascript process."""
+    if not _IS_MACOS:
+        return
+    global _osascript_proc
+    line = f"display notification {_applescript_quote(message)} with title {_applescript_quote(title)}\n"
+    with _osascript_lock:
+        # Spawn once; respawn only if the helper died
+        for _ in range(2):
+            try:
+                if _osascript_proc is None or _osascript_proc.poll() is not None:
+                    _osascript_proc = subprocess.Popen(
+                        ['osascript', '-i'], stdin=subprocess.PIPE,
+                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, text=True)
+                _osascript_proc.stdin.write(line)
+                _osascript_proc.stdin.flush()
+                return
+            except (BrokenPipeError, ValueError):
+                _osascript_proc = None
+            except (subprocess.SubprocessError, OSError):
+                # Silently fail if notifications don't work
+                return
+
+
+# Separators for trade log output
+_BANNER = "=" * 70
+_LOG_ENTRY_RULE = "-" * 70 + "\n"
+
+# Header for data/trades.csv (enhanced columns)
+_TRADES_CSV_HEADER = [
+    'timestamp', 'market_ticker', 'order_id', 'action', 'side', 'count',
+    'price', 'edge', 'ev', 'strategy_mode', 'our_probability',
+    'market_price', 'status',
+    # Enhanced columns for analysis
+    'mean_forecast', 'forecast_std', 'ci_lower', 'ci_upper',
+    'time_decay_factor', 'num_sources', 'threshold', 'target_date'
+]
+
+
+def _csv_field(value) -> str:
+    """Format one CSV field like csv.writer (QUOTE_MINIMAL): quote only when needed."""
+    if value is None:
+        return ''
+    text = str(value)
+    if ',' in text or '"' in text or '\n' in text or '\r' in text:
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
+def _csv_line(row: List) -> str:
+    """One CSV row with csv.writer's default CRLF terminator, so existing files stay uniform."""
+    return ','.join(map(_csv_field, row)) + '\r\n'
+
+
+class _TradeLogger:
+    """Append trades.log / data/trades.csv entries from a background thread.
+
+    Callers queue pre-formatted entries; the writer keeps both files open and
+    writes in batches (up to 64 entries or 100ms), flushing after each batch.
+    Pending entries are drained at interpreter exit.
+    """
+
+    _STOP = object()
+
+    def __init__(self, log_file: str = "trades.log", csv_file: Path = Path("data/trades.csv")):
+        self.log_file = log_file
+        self.csv_file = csv_file
+        self._queue = queue.Queue(maxsize=10000)
+        self._thread = threading.Thread(target=self._drain, name="trade-logger", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, log_entry: str, csv_row: Optional[List]):
+        """Queue one trade entry (csv_row may be None for log-only entries, e.g. errors).
+
+        Never blocks the trading thread: if the writer has fallen 10000 entries
+        behind, the entry is dropped and logged instead.
+        """
+        try:
+            self._queue.put_nowait((log_entry, csv_row))
+        except queue.Full:
+            logger.error(f"Trade log queue full, dropping entry: {log_entry.strip()[:200]}")
+
+    def close(self):
+        """Write everything queued so far and stop the writer thread."""
+        if self._thread.is_alive():
+            try:
+                self._queue.put(self._STOP, timeout=5)
+            except queue.Full:
+                logger.error("Trade log queue full at exit, pending entries may be lost")
+                return
+            self._thread.join(timeout=5)
+
+    def _open_files(self):
+        """Open trades.log and trades.csv for append (writing the CSV header if new); None on failure."""
+        try:
+            self.csv_file.parent.mkdir(exist_ok=True)
+            new_csv = not self.csv_file.exists()
+            log_f = open(self.log_file, 'a')
+            try:
+                csv_f = open(self.csv_file, 'a', newline='')
+                if new_csv:
+                    csv_f.write(_csv_line(_TRADES_CSV_HEADER))
+            except Exception:
+                log_f.close()
+                raise
+            return log_f, csv_f
+        except Exception as e:
+            logger.error(f"Error opening trade log files: {e}")
+            return None
+
+    def _drain(self):
+        # Keep both files open between batches; reopen on the next batch after an error
+        files = None
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + 0.1
+            while len(batch) < 64:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+
+            stop = any(item is self._STOP for item in batch)
+            entries = [item for item in batch if item is not self._STOP]
+            if entries and files is None:
+                files = self._open_files()
+                if files is None:
+                    logger.error(f"Error logging trade: files unavailable, dropped {len(entries)} entries")
+            if entries and files is not None:
+                log_f, csv_f = files
+                try:
+                    for log_entry, csv_row in entries:
+                        log_f.write(log_entry)
+                        if csv_row is not None:
+                            csv_f.write(_csv_line(csv_row))
+                    log_f.flush()
+                    csv_f.flush()
+                except Exception as e:
+                    logger.error(f"Error logging trade: {e}")
+                    for fh in files:
+                        try:
+                            fh.close()
+                        except Exception:
+                            pass
+                    files = None
+            if stop:
+                if files is not None:
+                    for fh in files:
+                        fh.close()
+                return
+
+
+_trade_logger = None
+
+
+def get_trade_logger() -> _TradeLogger:
+    """Get global background trade logger (started on first use)"""
+    global _trade_logger
+    if _trade_logger is None:
+        _trade_logger = _TradeLogger()
+    return _trade_logger
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_ticker_date(ticker: str) -> Optional[datetime]:
+    """Target date from a ticker's YYMMMDD segment (KXHIGHNY-26JAN28-T26 -> Jan 28, 2026), else None.
+
+    Memoized: the same tickers come back every scan and the mapping is fixed.
+    """
+    if '-' in ticker:
+        parts = ticker.split('-')
+        if len(parts) >= 2:
+            date_str = parts[1]  # e.g., "26JAN28"
+            try:
+                if len(date_str) >= 7:  # YYMMMDD = 7 chars
+                    year_str = date_str[:2]  # "26"
+                    month_str = date_str[2:5].upper()  # "JAN"
+                    day_str = date_str[5:]  # "28"
+
+                    if month_str in _MONTH_MAP:
+                        year = 2000 + int(year_str)  # "26" -> 2026
+                        month = _MONTH_MAP[month_str]
+                        day = int(day_str)
+                        return datetime(year, month, day)
+            except (ValueError, KeyError, IndexError):
+                pass
+    return None
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_title_date(title: str) -> Optional[datetime]:
+    """Explicit date in a market title ("on Jan 28, 2026" or "01/28/2026"), else None. Memoized."""
+    for pattern in (_DATE_RE_MONTH, _DATE_RE_NUM):
+        match = pattern.search(title)
+        if match:
+            try:
+                if pattern is _DATE_RE_MONTH:
+                    month_name, day, year = match.groups()
+                    month = _MONTH_MAP[month_name.upper()]
+                    return datetime(int(year), month, int(day))
+                else:  # Second pattern
+                    parts = match.groups()
+                    if len(parts) == 3:
+                        # Could be MM/DD/YYYY or DD/MM/YYYY - try both
+                        try:
+                            month, day, year = map(int, parts)
+                            # Try MM/DD/YYYY first (US format)
+                            return datetime(year, month, day)
+                        except ValueError:
+                            pass
+            except (ValueError, KeyError):
+                continue
+    return None
+
+
+@functools.lru_cache(maxsize=20000)
+def base_ticker(ticker: str) -> str:
+    """Base market (series + date) of a ticker, e.g. KXHIGHMIA-26FEB01-B51.5 -> KXHIGHMIA-26FEB01.
+
+    Tickers with fewer than two dash-separated parts are returned unchanged.
+    Memoized: the same tickers come back every scan.
+    """
+    parts = ticker.split('-', 2)
+    return parts[0] + '-' + parts[1] if len(parts) >= 2 else ticker
+
+
+def _index_by_base_market(items: List[Dict]) -> Dict[str, List[Dict]]:
+    """Group positions/orders by base market (series + date, e.g. KXHIGHMIA-26FEB01).
+
+    Tickers that are their own base market (no threshold suffix) are skipped.
+    """
+    index = defaultdict(list)
+    for item in items:
+        ticker = item.get('ticker') or ''
+        base = base_ticker(ticker)
+        if base != ticker:
+            index[base].append(item)
+    return index
+
+
+class Position:
+    """A position opened by this bot, tracked in active_positions for exit logic."""
+
+    __slots__ = ('side', 'entry_price', 'entry_time', 'entry_mono', 'count', 'edge', 'ev',
+                 'strategy_mode')
+
+    def __init__(self, side: str, entry_price: int, entry_time: datetime, count: int,
+                 edge: float, ev: float, strategy_mode: str):
+        self.side = side
+        self.entry_price = entry_price
+        self.entry_time = entry_time  # wall clock, for display
+        self.entry_mono = time.monotonic()  # for hold-time checks in _check_exit
+        self.count = count
+        self.edge = edge
+        self.ev = ev
+        self.strategy_mode = strategy_mode
+
+
 class TradingStrategy:
     """Base class for trading strategies"""
 
@@ -45,6 +332,19 @@ class TradingStrategy:
         # Resting orders snapshot — set by bot.py at start of each scan cycle
         # to avoid fetching resting orders per-market (single-threaded, can't change mid-scan)
         self._resting_orders_snapshot = None
+        # Positions snapshot — same lifecycle as the resting orders snapshot. Not refreshed
+        # after we place an order: the order is appended to the resting orders snapshot
+        # instead (_record_placed_order), so exposure checks count it either way. Both
+        # snapshots are dropped only if create_order fails and the order state is unknown.
+        self._positions_snapshot = None
+        # Scan start time — set by bot.py with the snapshots so every market in a scan
+        # shares one "now" (None outside a scan: use the wall clock)
+        self._scan_now = None
+        # (scan_now, {tz_name: local date}) for _local_today
+        self._scan_local_dates = (None, {})
+        # (source list, base-market index, length) for the snapshots above, rebuilt when the list changes
+        self._positions_index = None
+        self._orders_index = None
 
         # Data store for backtesting (shared instance)
         self.data_store = get_data_store()
@@ -60,6 +360,62 @@ class TradingStrategy:
             return self._resting_orders_snapshot
         return self.client.get_orders(status='resting', use_cache=False)
 
+    def _now(self) -> datetime:
+        """Current scan's start time, or the wall clock outside a scan."""
+        return self._scan_now or datetime.now()
+
+    def _local_today(self, tz_name: Optional[str]):
+        """Today's date in tz_name (system local time if None), computed once per scan."""
+        from zoneinfo import ZoneInfo
+        if self._scan_now is None:
+            return datetime.now(ZoneInfo(tz_name)).date() if tz_name else datetime.now().date()
+        scan_now, dates = self._scan_local_dates
+        if scan_now is not self._scan_now:
+            dates = {}
+            self._scan_local_dates = (self._scan_now, dates)
+        today = dates.get(tz_name)
+        if today is None:
+            # Naive scan time is system local time; astimezone() attaches that zone first
+            today = self._scan_now.astimezone(ZoneInfo(tz_name)).date() if tz_name else self._scan_now.date()
+            dates[tz_name] = today
+        return today
+
+    def _get_positions(self) -> List[Dict]:
+        """Return positions from snapshot if available, else fetch from API."""
+        if self._positions_snapshot is not None:
+            return self._positions_snapshot
+        return self.client.get_positions()
+
+    def _by_base_market(self, items: List[Dict], cache_attr: str) -> Dict[str, List[Dict]]:
+        """Base-market index of items, reused while the same snapshot list is passed in."""
+        cached = getattr(self, cache_attr)
+        # Length check catches in-place appends (see _record_placed_order)
+        if cached is not None and cached[0] is items and cached[2] == len(items):
+            return cached[1]
+        index = _index_by_base_market(items)
+        setattr(self, cache_attr, (items, index, len(items)))
+        return index
+
+    def _record_placed_order(self, order: Dict, decision: Dict, market_ticker: str):
+        """Add a just-placed order to the resting-orders snapshot and client cache.
+
+        The snapshot list is shared by all strategies, so it is appended in place.
+        The full count is recorded as resting even if part of it filled immediately
+        (positions snapshot isn't refreshed), so exposure is never under-counted.
+        """
+        if self._resting_orders_snapshot is not None:
+            self._resting_orders_snapshot.append({
+                'order_id': order.get('order_id'),
+                'ticker': market_ticker,
+                'action': decision['action'],
+                'side': decision['side'],
+                'remaining_count': decision['count'],
+                'yes_price': order.get('yes_price') or (decision.get('price', 0) if decision['side'] == 'yes' else 0),
+                'no_price': order.get('no_price') or (decision.get('price', 0) if decision['side'] == 'no' else 0),
+                'status': 'resting',
+            })
+        self.client.append_resting_order(order)
+
     def _has_resting_order_on_ticker(self, ticker: str) -> bool:
         """
         Check if we already have a resting order or paper position on this EXACT ticker.
@@ -101,17 +457,15 @@ class TradingStrategy:
         This means all temperature thresholds for a market are combined.
 
         Uses get_positions() for actual holdings (not get_fills which is historical).
-        Uses use_cache=False for resting orders to get fresh data for accurate limit checks.
+        Positions and resting orders come from the per-scan snapshots when set
+        (orders placed this scan are appended to the resting orders snapshot, not
+        refetched), else fresh API calls.
         """
         try:
             # Extract base market ticker (remove threshold suffix)
             # e.g., KXHIGHMIA-26FEB01-B51.5 -> KXHIGHMIA-26FEB01
             # e.g., KXHIGHMIA-26FEB01-T64 -> KXHIGHMIA-26FEB01
-            parts = market_ticker.split('-')
-            if len(parts) >= 3:
-                base_market = '-'.join(parts[:2])  # Take series + date
-            else:
-                base_market = market_ticker
+            base_market = base_ticker(market_ticker)
             
             total_contracts = 0
             total_dollars = 0.0
@@ -120,54 +474,42 @@ class TradingStrategy:
             # Get ACTUAL current positions (not historical fills)
             # Check ALL thresholds for this base market
             try:
-                positions = self.client.get_positions()
-                for position in positions:
-                    pos_ticker = position.get('ticker', '')
-                    # Check if this position belongs to our base market
-                    pos_parts = pos_ticker.split('-')
-                    if len(pos_parts) >= 2:
-                        pos_base = '-'.join(pos_parts[:2])
-                        if pos_base == base_market:
-                            # 'position' field is the net contract count (can be negative for short)
-                            contracts = abs(position.get('position', 0))
-                            total_contracts += contracts
-
-                            # Track which sides we hold (for contradictory position detection)
-                            if contracts > 0:
-                                pos_val = position.get('position', 0)
-                                if pos_val > 0:
-                                    sides_held.add('yes')
-                                elif pos_val < 0:
-                                    sides_held.add('no')
-
-                            # Use market_exposure from API (actual dollars at risk)
-                            # This is the real cost basis, not an estimate
-                            market_exposure = position.get('market_exposure', 0)
-                            # market_exposure is in cents, convert to dollars
-                            cost_dollars = market_exposure / 100.0
-                            total_dollars += cost_dollars
+                positions = self._by_base_market(self._get_positions(), '_positions_index')
+                for position in positions.get(base_market, ()):
+                    # 'position' field is the net contract count (can be negative for short)
+                    contracts = abs(position.get('position', 0))
+                    total_contracts += contracts
+
+                    # Track which sides we hold (for contradictory position detection)
+                    if contracts > 0:
+                        pos_val = position.get('position', 0)
+                        if pos_val > 0:
+                            sides_held.add('yes')
+                        elif pos_val < 0:
+                            sides_held.add('no')
+
+                    # Use market_exposure from API (actual dollars at risk)
+                    # This is the real cost basis, not an estimate
+                    market_exposure = position.get('market_exposure', 0)
+                    # market_exposure is in cents, convert to dollars
+                    cost_dollars = market_exposure / 100.0
+                    total_dollars += cost_dollars
             except Exception as e:
                 logger.debug(f"Could not fetch positions for {base_market}: {e}")
 
             # Get resting (open) orders from scan snapshot (or fresh API call)
             try:
-                orders = self._get_resting_orders()
-                for order in orders:
-                    order_ticker = order.get('ticker', '')
-                    # Check if this order belongs to our base market
-                    order_parts = order_ticker.split('-')
-                    if len(order_parts) >= 2:
-                        order_base = '-'.join(order_parts[:2])
-                        if order_base == base_market:
-                            remaining = order.get('remaining_count', 0)
-                            total_contracts += remaining
-
-                            side = order.get('side', '')
-                            if side == 'yes':
-                                price = order.get('yes_price', 0)
-                            else:
-                                price = order.get('no_price', 0)
-                            total_dollars += (remaining * price) / 100.0
+                orders = self._by_base_market(self._get_resting_orders(), '_orders_index')
+                for order in orders.get(base_market, ()):
+                    remaining = order.get('remaining_count', 0)
+                    total_contracts += remaining
+
+                    side = order.get('side', '')
+                    if side == 'yes':
+                        price = order.get('yes_price', 0)
+                    else:
+                        price = order.get('no_price', 0)
+                    total_dollars += (remaining * price) / 100.0
             except Exception as e:
                 # CRITICAL: If we can't verify resting orders, assume at limit
                 # to prevent duplicate orders during rate limiting (429)
@@ -212,7 +554,7 @@ class TradingStrategy:
         """
         total = 0
         try:
-            positions = self.client.get_positions()
+            positions = self._get_positions()
             for pos in positions:
                 if pos.get('ticker', '') == market_ticker:
                     total += abs(pos.get('position', 0))
@@ -233,7 +575,7 @@ class TradingStrategy:
         if Config.PAPER_TRADING and hasattr(self, 'active_positions'):
             ap = self.active_positions.get(market_ticker)
             if ap:
-                total += ap.get('count', 0)
+                total += ap.count
 
         return total
 
@@ -255,11 +597,10 @@ class TradingStrategy:
         opposite_side = 'no' if side == 'yes' else 'yes'
 
         # Extract base market (e.g., KXHIGHNY-26FEB07 from KXHIGHNY-26FEB07-T24)
-        parts = market_ticker.split('-')
-        base_market = '-'.join(parts[:2]) if len(parts) >= 2 else market_ticker
+        base_market = base_ticker(market_ticker)
 
         try:
-            positions = self.client.get_positions()
+            positions = self._get_positions()
             for position in positions:
                 pos_ticker = position.get('ticker', '')
                 pos_count = position.get('position', 0)
@@ -267,10 +608,7 @@ class TradingStrategy:
                     continue
 
                 # Check if position is on the same base market
-                pos_parts = pos_ticker.split('-')
-                pos_base = '-'.join(pos_parts[:2]) if len(pos_parts) >= 2 else pos_ticker
-
-                if pos_base == base_market:
+                if base_ticker(pos_ticker) == base_market:
                     # Determine which side this position is on
                     # Positive position = YES, Negative position = NO
                     held_side = 'yes' if pos_count > 0 else 'no'
@@ -293,10 +631,7 @@ class TradingStrategy:
             orders = self._get_resting_orders()
             for order in orders:
                 order_ticker = order.get('ticker', '')
-                order_parts = order_ticker.split('-')
-                order_base = '-'.join(order_parts[:2]) if len(order_parts) >= 2 else order_ticker
-
-                if order_base == base_market and order.get('side') == opposite_side:
+                if base_ticker(order_ticker) == base_market and order.get('side') == opposite_side:
                     remaining = order.get('remaining_count', 0)
                     if remaining > 0:
                         logger.warning(
@@ -315,6 +650,24 @@ class TradingStrategy:
     def execute_trade(self, decision: Dict, market_ticker: str) -> Optional[Dict]:
         """Execute a trade"""
         try:
+            new_count = decision.get('count', 0)
+            new_price = decision.get('price', 0)
+            # Per-market limits, read once for the checks below
+            max_contracts = Config.MAX_CONTRACTS_PER_MARKET
+            max_dollars = Config.MAX_DOLLARS_PER_MARKET
+            max_price = Config.MAX_BUY_PRICE_CENTS
+
+            # Static limit checks first — these don't depend on current exposure,
+            # so they never need the positions/orders fetch below
+            # Never buy at 100¢ (no value)
+            if new_price > max_price:
+                logger.warning(f"⛔ BLOCKED trade on {market_ticker}: price {new_price}¢ > MAX_BUY_PRICE_CENTS ({max_price})")
+                return None
+            # A single contract already costs more than the per-market dollar cap
+            if new_price > max_dollars * 100:
+                logger.warning(f"⛔ BLOCKED trade on {market_ticker}: one contract @ {new_price}¢ exceeds dollar limit (${max_dollars:.2f})")
+                return None
+
             # CRITICAL: Hard block on contradictory positions BEFORE anything else
             trade_side = decision.get('side', '')
             if self._check_contradictory_position(market_ticker, trade_side):
@@ -327,26 +680,17 @@ class TradingStrategy:
             existing_dollars = existing_exposure['total_dollars']
             base_market = existing_exposure.get('base_market', market_ticker)
 
-            # Check if we would exceed limits with this trade
-            new_count = decision.get('count', 0)
-            new_price = decision.get('price', 0)
-
-            # Never buy at 100¢ (no value)
-            if new_price > Config.MAX_BUY_PRICE_CENTS:
-                logger.warning(f"⛔ BLOCKED trade on {market_ticker}: price {new_price}¢ > MAX_BUY_PRICE_CENTS ({Config.MAX_BUY_PRICE_CENTS})")
-                return None
-
             # Cap quantity to remaining contract capacity
-            contracts_remaining = max(0, Config.MAX_CONTRACTS_PER_MARKET - existing_contracts)
+            contracts_remaining = max(0, max_contracts - existing_contracts)
             if contracts_remaining <= 0:
-                logger.warning(f"⛔ BLOCKED trade on {market_ticker}: at contract limit ({existing_contracts}/{Config.MAX_CONTRACTS_PER_MARKET}) for {base_market}")
+                logger.warning(f"⛔ BLOCKED trade on {market_ticker}: at contract limit ({existing_contracts}/{max_contracts}) for {base_market}")
                 return None
 
             # Cap quantity to remaining dollar capacity
-            dollars_remaining = max(0, Config.MAX_DOLLARS_PER_MARKET - existing_dollars)
+            dollars_remaining = max(0, max_dollars - existing_dollars)
             dollar_cap_contracts = int(dollars_remaining * 100 / new_price) if new_price > 0 else contracts_remaining
             if dollar_cap_contracts <= 0:
-                logger.warning(f"⛔ BLOCKED trade on {market_ticker}: at dollar limit (${existing_dollars:.2f}/${Config.MAX_DOLLARS_PER_MARKET:.2f}) for {base_market}")
+                logger.warning(f"⛔ BLOCKED trade on {market_ticker}: at dollar limit (${existing_dollars:.2f}/${max_dollars:.2f}) for {base_market}")
                 return None
 
             # Apply the tighter of both caps
@@ -390,8 +734,7 @@ class TradingStrategy:
                 }
 
                 # Track paper exposure locally for limit enforcement
-                parts = market_ticker.split('-')
-                base = '-'.join(parts[:2]) if len(parts) >= 2 else market_ticker
+                base = base_ticker(market_ticker)
                 pp = self._paper_positions.setdefault(base, {'contracts': 0, 'dollars': 0.0, 'sides': set()})
                 is_sell = decision.get('action') == 'sell'
                 if is_sell:
@@ -418,10 +761,19 @@ class TradingStrategy:
                         no_price=no_price,
                         client_order_id=str(uuid.uuid4())
                     )
-                finally:
-                    # ALWAYS invalidate orders cache after order attempt (success or failure)
-                    # This ensures subsequent exposure checks see accurate order state
+                except Exception:
+                    # Order state unknown — drop cached orders/positions so the next
+                    # exposure check refetches from the API
                     self.client.invalidate_orders_cache()
+                    self._resting_orders_snapshot = None
+                    self._positions_snapshot = None
+                    raise
+                else:
+                    # Order known: update cached orders in place instead of refetching
+                    self._record_placed_order(order, decision, market_ticker)
+                finally:
+                    if hasattr(self, 'risk_manager'):
+                        self.risk_manager.invalidate_positions()
 
             # Store trade in data store for backtesting
             try:
@@ -462,19 +814,19 @@ class TradingStrategy:
             count = decision['count']
             price = decision.get('price', 'N/A')
             
-            # Get current exposure for this market to display
-            try:
-                exp = self._get_market_exposure(market_ticker)
-                exposure_str = f" | Exposure: {exp['total_contracts']}/{Config.MAX_CONTRACTS_PER_MARKET} contracts, ${exp['total_dollars']:.2f}/${Config.MAX_DOLLARS_PER_MARKET:.2f}"
-            except (KeyError, TypeError, ValueError):
-                exposure_str = ""
+            # Exposure for this market to display: the pre-trade check plus this order
+            # (known locally, so no second positions/orders fetch)
+            if action == 'buy':
+                exp_contracts = existing_contracts + new_count
+                exp_dollars = existing_dollars + new_dollars
+            else:
+                exp_contracts, exp_dollars = existing_contracts, existing_dollars
+            exposure_str = f" | Exposure: {exp_contracts}/{max_contracts} contracts, ${exp_dollars:.2f}/${max_dollars:.2f}"
             
             trade_msg = f"🔄 TRADE EXECUTED: {action.upper()} {count} {side.upper()} @ {price}¢{exposure_str} | Order: {order_id} | Market: {market_ticker}"
             
-            # Log to console and file
-            logger.info("="*70)
-            logger.info(trade_msg)
-            logger.info("="*70)
+            # Log to console and file (one record, banner lines included)
+            logger.info(f"{_BANNER}\n{trade_msg}\n{_BANNER}")
             
             # Log to file
             self._log_trade(trade_msg, order, decision, market_ticker)
@@ -490,75 +842,56 @@ class TradingStrategy:
             return None
     
     def _log_trade(self, message: str, order: Optional[Dict], decision: Dict, market_ticker: str):
-        """Log trade to file (both human-readable and CSV for analysis)"""
-        try:
-            from datetime import datetime
-            import csv
-            from pathlib import Path
+        """Log trade to file (both human-readable and CSV for analysis).
 
+        Entries are formatted here and handed to the background trade logger, so
+        the trading path never waits on disk.
+        """
+        try:
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
             # Human-readable log
-            log_file = "trades.log"
-            log_entry = f"[{timestamp}] {message}\n"
+            parts = [f"[{timestamp}] {message}\n"]
             if order:
-                log_entry += f"  Order Details: {order}\n"
-            log_entry += f"  Decision: {decision}\n"
-            log_entry += "-" * 70 + "\n"
-
-            with open(log_file, 'a') as f:
-                f.write(log_entry)
-
-            # Structured CSV for outcome tracking (enhanced columns)
-            csv_file = Path("data/trades.csv")
-            csv_file.parent.mkdir(exist_ok=True)
-
-            # Create CSV with headers if it doesn't exist (enhanced columns)
-            if not csv_file.exists():
-                with open(csv_file, 'w', newline='') as f:
-                    writer = csv.writer(f)
-                    writer.writerow([
-                        'timestamp', 'market_ticker', 'order_id', 'action', 'side', 'count',
-                        'price', 'edge', 'ev', 'strategy_mode', 'our_probability',
-                        'market_price', 'status',
-                        # Enhanced columns for analysis
-                        'mean_forecast', 'forecast_std', 'ci_lower', 'ci_upper',
-                        'time_decay_factor', 'num_sources', 'threshold', 'target_date'
-                    ])
-
-            # Append trade details with enhanced columns
+                parts.append(f"  Order Details: {order}\n")
+            parts.append(f"  Decision: {decision}\n")
+            parts.append(_LOG_ENTRY_RULE)
+            log_entry = ''.join(parts)
+
+            # Structured CSV row for outcome tracking (enhanced columns)
+            csv_row = None
             if order:
                 # For sell orders, market_price column stores entry_price (cost basis)
                 # For buy orders, it stores the buy price (same as price column)
                 is_sell = decision.get('action') == 'sell'
                 market_price_col = decision.get('entry_price', decision.get('price', 0)) if is_sell else decision.get('price', 0)
 
-                with open(csv_file, 'a', newline='') as f:
-                    writer = csv.writer(f)
-                    writer.writerow([
-                        datetime.now().isoformat(),
-                        market_ticker,
-                        order.get('order_id', ''),
-                        decision.get('action', ''),
-                        decision.get('side', ''),
-                        decision.get('count', 0),
-                        decision.get('price', 0),
-                        decision.get('edge', 0),
-                        decision.get('ev', 0),
-                        decision.get('strategy_mode', ''),
-                        decision.get('our_probability', ''),
-                        market_price_col,  # entry_price for sells, buy_price for buys
-                        order.get('status', 'unknown'),
-                        # Enhanced columns
-                        decision.get('mean_forecast', ''),
-                        decision.get('forecast_std', ''),
-                        decision.get('ci_lower', ''),
-                        decision.get('ci_upper', ''),
-                        decision.get('time_decay_factor', ''),
-                        decision.get('num_sources', ''),
-                        decision.get('threshold', ''),
-                        decision.get('target_date', '')
-                    ])
+                csv_row = [
+                    datetime.now().isoformat(),
+                    market_ticker,
+                    order.get('order_id', ''),
+                    decision.get('action', ''),
+                    decision.get('side', ''),
+                    decision.get('count', 0),
+                    decision.get('price', 0),
+                    decision.get('edge', 0),
+                    decision.get('ev', 0),
+                    decision.get('strategy_mode', ''),
+                    decision.get('our_probability', ''),
+                    market_price_col,  # entry_price for sells, buy_price for buys
+                    order.get('status', 'unknown'),
+                    # Enhanced columns
+                    decision.get('mean_forecast', ''),
+                    decision.get('forecast_std', ''),
+                    decision.get('ci_lower', ''),
+                    decision.get('ci_upper', ''),
+                    decision.get('time_decay_factor', ''),
+                    decision.get('num_sources', ''),
+                    decision.get('threshold', ''),
+                    decision.get('target_date', '')
+                ]
+
+            get_trade_logger().submit(log_entry, csv_row)
         except Exception as e:
             logger.error(f"Error logging trade: {e}")
 
@@ -593,16 +926,7 @@ class TradingStrategy:
     
     def _send_notification(self, title: str, message: str):
         """Send macOS notification"""
-        try:
-            import subprocess
-            # Use osascript to send macOS notification
-            script = f'''
-            display notification "{message}" with title "{title}"
-            '''
-            subprocess.run(['osascript', '-e', script], capture_output=True)
-        except (subprocess.SubprocessError, FileNotFoundError, OSError):
-            # Silently fail if notifications don't work
-            pass
+        send_notification(title, message)
 
 
 class WeatherDailyStrategy(TradingStrategy):
@@ -631,11 +955,13 @@ class WeatherDailyStrategy(TradingStrategy):
         self.weather_agg = WeatherDataAggregator()
         self.extract_threshold = extract_threshold_from_market
         
-        # Cache for probability distributions (keyed by series_ticker + date)
+        # Cache for probability distributions (keyed by series_ticker + date):
+        # {(series_ticker, date_ordinal, is_range, forecasts): (monotonic_ts, distribution)}
         self.prob_cache = {}
+        self.prob_cache_ttl = Config.PROB_CACHE_TTL
         
         # Track active positions for exit logic
-        self.active_positions: Dict[str, Dict] = {}  # {market_ticker: position_info}
+        self.active_positions: Dict[str, Position] = {}  # {market_ticker: Position}
 
         # Scaled edge requirements - require more edge for expensive contracts
         self.scaled_edge_enabled = Config.SCALED_EDGE_ENABLED
@@ -669,6 +995,11 @@ class WeatherDailyStrategy(TradingStrategy):
         # then trade only the highest-EV threshold per city+date.
         self._pending_decisions = {}  # {base_market: (decision_dict, market_ticker)}
 
+        # Exit re-evaluation: get_trade_decision runs nested inside _check_exit with
+        # _checking_exit set; its result is kept so the outer call doesn't evaluate again
+        self._checking_exit = False
+        self._exit_recheck = None  # (decision,) from the last _check_exit re-evaluation
+
         # Settlement divergence tracker — reduce confidence for overconfident cities
         self.settlement_tracker = None
         try:
@@ -750,8 +1081,7 @@ class WeatherDailyStrategy(TradingStrategy):
                     self._paper_tickers.add(ticker)
 
                     # Accumulate paper positions
-                    parts = ticker.split('-')
-                    base = '-'.join(parts[:2]) if len(parts) >= 2 else ticker
+                    base = base_ticker(ticker)
                     pp = self._paper_positions.setdefault(base, {
                         'contracts': 0, 'dollars': 0.0, 'sides': set()
                     })
@@ -825,8 +1155,7 @@ class WeatherDailyStrategy(TradingStrategy):
 
         Only keeps the highest-EV decision per base market (city+date).
         """
-        parts = market_ticker.split('-')
-        base_market = '-'.join(parts[:2]) if len(parts) >= 2 else market_ticker
+        base_market = base_ticker(market_ticker)
 
         existing = self._pending_decisions.get(base_market)
         if existing is None or decision['ev'] > existing[0]['ev']:
@@ -928,7 +1257,7 @@ class WeatherDailyStrategy(TradingStrategy):
         total_dollars = 0.0
 
         try:
-            positions = self.client.get_positions()
+            positions = self._get_positions()
             for position in positions:
                 pos_ticker = position.get('ticker', '')
                 pos_parts = pos_ticker.split('-')
@@ -1030,11 +1359,14 @@ class WeatherDailyStrategy(TradingStrategy):
         if opposite_side in existing_sides:
             return None
 
+        # Ask as a probability/dollar fraction, for the CI comparisons and Kelly sizing
+        ask_dollars = ask_price / 100.0
+
         # Determine Kelly usage based on mode
         if is_longshot:
-            use_kelly = (ci_lower > ask_price / 100.0 or ci_upper < ask_price / 100.0)
+            use_kelly = (ci_lower > ask_dollars or ci_upper < ask_dollars)
         else:
-            use_kelly = len(forecasts) >= 2 and prob > 0.7 and (ci_lower > ask_price / 100.0)
+            use_kelly = len(forecasts) >= 2 and prob > 0.7 and (ci_lower > ask_dollars)
 
         # Position sizing: EV-proportional (new) or Kelly/Confidence (legacy)
         if ask_price <= 0:
@@ -1044,12 +1376,12 @@ class WeatherDailyStrategy(TradingStrategy):
             base_position = self._calculate_ev_proportional_size(ev, is_longshot=is_longshot)
             logger.debug(f"EV-proportional sizing: EV=${ev:.4f}, position={base_position}")
         elif use_kelly and len(forecasts) >= 2:
-            payout_ratio = 1.0 / (ask_price / 100.0)
+            payout_ratio = 1.0 / ask_dollars
             kelly_fractional = 0.5 if is_longshot else 0.25
             kelly_fraction = self.weather_agg.kelly_fraction(prob, payout_ratio, fractional=kelly_fractional)
             portfolio = self.client.get_portfolio()
             portfolio_value = (portfolio.get('balance', 0) + portfolio.get('portfolio_value', 0)) / 100.0
-            kelly_position = int(kelly_fraction * portfolio_value / (ask_price / 100.0))
+            kelly_position = int(kelly_fraction * portfolio_value / ask_dollars)
             if is_longshot:
                 base_position = min(kelly_position, self.max_position_size * 5)
             else:
@@ -1255,23 +1587,23 @@ class WeatherDailyStrategy(TradingStrategy):
         target_date_str = decision['target_date']
 
         # INFO-level trade announcement (only for the winning side)
-        confidence_str = f"CI: [{ci_lower:.1%}, {ci_upper:.1%}]" if use_kelly else ""
         if is_longshot:
+            confidence_str = f"CI: [{ci_lower:.1%}, {ci_upper:.1%}]" if use_kelly else ""
             logger.info(f"🎯 LONGSHOT {side.upper()} {market_ticker}: Ask {ask_price}¢ (cheap!), Our Prob: {prob:.1%} {confidence_str}, Edge: {edge:.1f}%, EV: ${ev:.4f} (with fees)")
             logger.info(f"💰 Asymmetric play: Risk ${execution_price/100 * position_size:.2f} for ${1.00 * position_size:.2f} payout ({(100/execution_price):.1f}x)")
         else:
             logger.info(f"✓ Conservative {side.upper()} {market_ticker}: Edge: {edge:.2f}%, EV: ${ev:.4f} (with fees), Our Prob: {prob:.2%} CI: [{ci_lower:.1%}, {ci_upper:.1%}], Price: {execution_price}¢")
 
         # Record position for exit logic
-        self.active_positions[market_ticker] = {
-            'side': side,
-            'entry_price': execution_price,
-            'entry_time': datetime.now(),
-            'count': position_size,
-            'edge': edge,
-            'ev': ev,
-            'strategy_mode': strategy_mode
-        }
+        self.active_positions[market_ticker] = Position(
+            side=side,
+            entry_price=execution_price,
+            entry_time=datetime.now(),
+            count=position_size,
+            edge=edge,
+            ev=ev,
+            strategy_mode=strategy_mode
+        )
 
         # Log detailed trade decision for analysis
         decision_label = f"{strategy_mode}_{side}"
@@ -1328,64 +1660,18 @@ class WeatherDailyStrategy(TradingStrategy):
         title = market.get('title', '')
         
         # Method 1: Parse from ticker (e.g., KXHIGHNY-26JAN28-T26 -> 26JAN28)
-        # Format is YYMMMDD: 26JAN28 = Year 2026, Month JAN, Day 28 = Jan 28, 2026
-        if '-' in ticker:
-            parts = ticker.split('-')
-            if len(parts) >= 2:
-                date_str = parts[1]  # e.g., "26JAN28"
-                try:
-                    if len(date_str) >= 7:  # YYMMMDD = 7 chars
-                        year_str = date_str[:2]  # "26"
-                        month_str = date_str[2:5].upper()  # "JAN"
-                        day_str = date_str[5:]  # "28"
-                        
-                        # Map month abbreviations
-                        month_map = {'JAN': 1, 'FEB': 2, 'MAR': 3, 'APR': 4, 'MAY': 5, 'JUN': 6,
-                                   'JUL': 7, 'AUG': 8, 'SEP': 9, 'OCT': 10, 'NOV': 11, 'DEC': 12}
-                        
-                        if month_str in month_map:
-                            year = 2000 + int(year_str)  # "26" -> 2026
-                            month = month_map[month_str]
-                            day = int(day_str)
-                            target = datetime(year, month, day)
-                            return target
-                except (ValueError, KeyError, IndexError):
-                    pass
-        
+        target = _parse_ticker_date(ticker)
+        if target is not None:
+            return target
+
         # Method 2: Parse from title (e.g., "on Jan 28, 2026")
-        import re
-        date_patterns = [
-            r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(\d{1,2}),\s+(\d{4})',  # "Jan 28, 2026"
-            r'(\d{1,2})[/-](\d{1,2})[/-](\d{4})',  # "01/28/2026" or "01-28-2026"
-        ]
-        
-        month_map = {'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
-                    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12}
-        
-        for pattern in date_patterns:
-            match = re.search(pattern, title, re.IGNORECASE)
-            if match:
-                try:
-                    if 'Jan|Feb' in pattern:  # First pattern
-                        month_name, day, year = match.groups()
-                        month = month_map[month_name.lower()]
-                        return datetime(int(year), month, int(day))
-                    else:  # Second pattern
-                        parts = match.groups()
-                        if len(parts) == 3:
-                            # Could be MM/DD/YYYY or DD/MM/YYYY - try both
-                            try:
-                                month, day, year = map(int, parts)
-                                # Try MM/DD/YYYY first (US format)
-                                return datetime(year, month, day)
-                            except ValueError:
-                                pass
-                except (ValueError, KeyError):
-                    continue
-        
+        target = _parse_title_date(title)
+        if target is not None:
+            return target
+
         # Method 3: Check if title says "today" or "tomorrow"
         title_lower = title.lower()
-        today = datetime.now()
+        today = self._now()
         if 'today' in title_lower:
             return today
         elif 'tomorrow' in title_lower:
@@ -1410,9 +1696,9 @@ class WeatherDailyStrategy(TradingStrategy):
 
         # Also check if ticker starts with weather series prefix
         is_weather = False
-        if series_ticker in Config.WEATHER_SERIES:
+        if series_ticker in Config.WEATHER_SERIES_SET:
             is_weather = True
-        elif any(ticker.startswith(prefix) for prefix in ['KXHIGH', 'KXLOW']):
+        elif ticker.startswith(Config.WEATHER_TICKER_PREFIXES):
             is_weather = True
 
         if not is_weather:
@@ -1442,6 +1728,33 @@ class WeatherDailyStrategy(TradingStrategy):
 
         return True
     
+    def _get_probability_distribution(self, forecasts: List[float], temp_ranges: List[tuple],
+                                      series_ticker: str, target_date: datetime,
+                                      is_range: bool) -> Dict:
+        """Probability distribution for a city/date, shared by all of its threshold markets.
+
+        The forecasts are part of the key, so a forecast refresh rebuilds the distribution;
+        entries also expire after PROB_CACHE_TTL (ensemble/ML inputs change more slowly).
+        """
+        now = time.monotonic()
+        cache_key = (series_ticker, target_date.toordinal(), is_range, tuple(forecasts))
+        cached = self.prob_cache.get(cache_key)
+        if cached and now - cached[0] < self.prob_cache_ttl:
+            return cached[1]
+
+        prob_dist = self.weather_agg.build_probability_distribution(
+            forecasts, temp_ranges, series_ticker, target_date,
+            is_range_market=is_range
+        )
+
+        # Drop expired entries so the cache doesn't grow across days
+        expired = [k for k, (ts, _) in self.prob_cache.items() if now - ts >= self.prob_cache_ttl]
+        for k in expired:
+            del self.prob_cache[k]
+        if prob_dist:
+            self.prob_cache[cache_key] = (now, prob_dist)
+        return prob_dist
+
     def get_trade_decision(self, market: Dict, orderbook: Dict) -> Optional[Dict]:
         """
         Advanced weather trading strategy:
@@ -1452,15 +1765,30 @@ class WeatherDailyStrategy(TradingStrategy):
         
         Also checks for existing positions and handles exit logic.
         """
+        # Most markets exit through a DEBUG skip line; don't build those messages when DEBUG is off
+        log_debug = logger.isEnabledFor(logging.DEBUG)
         try:
             market_ticker = market.get('ticker', '')
+            # Title direction, read once for the determined-outcome and probability checks
+            market_title = market.get('title', '').lower()
+            title_is_above = 'above' in market_title or '>' in market_title
             
             # Check if we have an active position to exit
             # Skip when called from _check_exit to avoid infinite recursion
-            if market_ticker in self.active_positions and not getattr(self, '_checking_exit', False):
+            if market_ticker in self.active_positions and not self._checking_exit:
                 exit_decision = self._check_exit(market, orderbook, market_ticker)
                 if exit_decision:
                     return exit_decision
+                # The exit check may already have evaluated this market; commit its result
+                recheck = self._exit_recheck
+                if recheck is not None:
+                    self._exit_recheck = None
+                    decision = recheck[0]
+                    if decision and decision.get('strategy_mode') != 'observation':
+                        self._finalize_decision(decision, market_ticker)
+                        self._defer_decision(decision, market_ticker)
+                        return None  # Deferred — bot.py flushes best decisions after scan
+                    return decision
             # Get series ticker - try multiple fields, fallback to ticker prefix
             series_ticker = market.get('series_ticker') or market.get('series_ticker_symbol') or ''
             ticker = market.get('ticker', '')
@@ -1473,7 +1801,8 @@ class WeatherDailyStrategy(TradingStrategy):
                         break
             
             if not series_ticker:
-                logger.debug(f"📊 SKIP {market_ticker}: could not determine series")
+                if log_debug:
+                    logger.debug(f"📊 SKIP {market_ticker}: could not determine series")
                 return None
             
             # Extract target date from market ticker or title
@@ -1481,28 +1810,32 @@ class WeatherDailyStrategy(TradingStrategy):
             # Title format: "Will the **high temp in NYC** be >26° on Jan 28, 2026?"
             target_date = self._extract_market_date(market)
             if not target_date:
-                logger.debug(f"📊 SKIP {market_ticker}: could not extract date from ticker/title")
+                if log_debug:
+                    logger.debug(f"📊 SKIP {market_ticker}: could not extract date from ticker/title")
                 return None
             
             # Verify date is reasonable (not too far in past/future)
-            today = datetime.now().date()
+            today = self._local_today(None)
             market_date = target_date.date()
             days_diff = (market_date - today).days
             
             max_days = Config.MAX_MARKET_DATE_DAYS
             if days_diff < -1 or days_diff > max_days:  # Allow -1 (yesterday) to max_days
-                logger.debug(f"📊 SKIP {market_ticker}: date too far (today ± {max_days}d, got {days_diff}d)")
+                if log_debug:
+                    logger.debug(f"📊 SKIP {market_ticker}: date too far (today ± {max_days}d, got {days_diff}d)")
                 return None
             
             # Extract temperature threshold from market title (single float or (low, high) range)
             threshold = self.extract_threshold(market)
             if not threshold:
-                logger.debug(f"📊 SKIP {market_ticker}: could not extract temp threshold from title")
+                if log_debug:
+                    logger.debug(f"📊 SKIP {market_ticker}: could not extract temp threshold from title")
                 return None
             
             # Range markets disabled entirely (0% WR in real trading)
             if isinstance(threshold, tuple) and not getattr(Config, 'RANGE_MARKETS_ENABLED', False):
-                logger.debug(f"📊 SKIP {market_ticker}: range markets disabled (RANGE_MARKETS_ENABLED=false)")
+                if log_debug:
+                    logger.debug(f"📊 SKIP {market_ticker}: range markets disabled (RANGE_MARKETS_ENABLED=false)")
                 return None
 
             # CRITICAL: Check if outcome is already determined by today's observations
@@ -1514,15 +1847,12 @@ class WeatherDailyStrategy(TradingStrategy):
             is_low_market = series_ticker.startswith('KXLOW')
 
             if is_low_market and getattr(Config, 'HIGH_ONLY', False):
-                logger.debug(f"📊 SKIP {market_ticker}: LOW market disabled (HIGH_ONLY mode)")
+                if log_debug:
+                    logger.debug(f"📊 SKIP {market_ticker}: LOW market disabled (HIGH_ONLY mode)")
                 return None
 
-            from zoneinfo import ZoneInfo
             tz_name = self.weather_agg.CITY_TIMEZONES.get(series_ticker)
-            if tz_name:
-                local_today = datetime.now(ZoneInfo(tz_name)).date()
-            else:
-                local_today = datetime.now().date()
+            local_today = self._local_today(tz_name)
 
             if target_date.date() == local_today:
                 # This market is for today (in the city's timezone) - check if outcome already determined
@@ -1544,7 +1874,8 @@ class WeatherDailyStrategy(TradingStrategy):
 
                 if observed:
                     if self._has_resting_order_on_ticker(market_ticker):
-                        logger.debug(f"📊 SKIP {market_ticker}: already have position/order on this ticker")
+                        if log_debug:
+                            logger.debug(f"📊 SKIP {market_ticker}: already have position/order on this ticker")
                         return None
 
                     observed_extreme, obs_time = observed
@@ -1568,8 +1899,7 @@ class WeatherDailyStrategy(TradingStrategy):
                                 reason = f"Observed low {observed_extreme:.1f}°F already below range [{range_low}-{range_high}°F)"
                     else:
                         # Single threshold market
-                        market_title = market.get('title', '').lower()
-                        is_above_market = 'above' in market_title or '>' in market_title
+                        is_above_market = title_is_above
                         obs_buffer = Config.OBSERVATION_MIN_BUFFER  # Must be ≥2°F past threshold to be "certain"
 
                         if is_high_market:
@@ -1579,14 +1909,16 @@ class WeatherDailyStrategy(TradingStrategy):
                                     outcome_determined = True
                                     reason = f"Observed high {observed_extreme:.1f}°F exceeds threshold {threshold}°F by {observed_extreme - threshold:.1f}°F (YES certain)"
                                 elif observed_extreme > threshold:
-                                    logger.debug(f"📊 Observation {observed_extreme:.1f}°F barely above threshold {threshold}°F (margin {observed_extreme - threshold:.1f}°F < {obs_buffer}°F buffer), NOT treating as certain")
+                                    if log_debug:
+                                        logger.debug(f"📊 Observation {observed_extreme:.1f}°F barely above threshold {threshold}°F (margin {observed_extreme - threshold:.1f}°F < {obs_buffer}°F buffer), NOT treating as certain")
                             else:
                                 # Market is "Will high be <X°?"
                                 if observed_extreme >= threshold + obs_buffer:
                                     outcome_determined = True
                                     reason = f"Observed high {observed_extreme:.1f}°F exceeds threshold {threshold}°F by {observed_extreme - threshold:.1f}°F (NO certain)"
                                 elif observed_extreme >= threshold:
-                                    logger.debug(f"📊 Observation {observed_extreme:.1f}°F barely at/above threshold {threshold}°F (margin {observed_extreme - threshold:.1f}°F < {obs_buffer}°F buffer), NOT treating as certain")
+                                    if log_debug:
+                                        logger.debug(f"📊 Observation {observed_extreme:.1f}°F barely at/above threshold {threshold}°F (margin {observed_extreme - threshold:.1f}°F < {obs_buffer}°F buffer), NOT treating as certain")
                         elif is_low_market:
                             if is_above_market:
                                 # Market is "Will low be >X°?"
@@ -1595,14 +1927,16 @@ class WeatherDailyStrategy(TradingStrategy):
                                     outcome_determined = True
                                     reason = f"Observed low {observed_extreme:.1f}°F below threshold {threshold}°F by {threshold - observed_extreme:.1f}°F (NO certain)"
                                 elif observed_extreme < threshold:
-                                    logger.debug(f"📊 Observation {observed_extreme:.1f}°F barely below threshold {threshold}°F (margin {threshold - observed_extreme:.1f}°F < {obs_buffer}°F buffer), NOT treating as certain")
+                                    if log_debug:
+                                        logger.debug(f"📊 Observation {observed_extreme:.1f}°F barely below threshold {threshold}°F (margin {threshold - observed_extreme:.1f}°F < {obs_buffer}°F buffer), NOT treating as certain")
                             else:
                                 # Market is "Will low be <X°?"
                                 if observed_extreme <= threshold - obs_buffer:
                                     outcome_determined = True
                                     reason = f"Observed low {observed_extreme:.1f}°F below threshold {threshold}°F by {threshold - observed_extreme:.1f}°F (YES certain)"
                                 elif observed_extreme <= threshold:
-                                    logger.debug(f"📊 Observation {observed_extreme:.1f}°F barely at/below threshold {threshold}°F (margin {threshold - observed_extreme:.1f}°F < {obs_buffer}°F buffer), NOT treating as certain")
+                                    if log_debug:
+                                        logger.debug(f"📊 Observation {observed_extreme:.1f}°F barely at/below threshold {threshold}°F (margin {threshold - observed_extreme:.1f}°F < {obs_buffer}°F buffer), NOT treating as certain")
                     
                     if outcome_determined:
                         # OBSERVATION-BASED TRADING: Instead of just skipping,
@@ -1620,27 +1954,26 @@ class WeatherDailyStrategy(TradingStrategy):
                             return obs_decision
 
                         # No observation trade available — skip and exclude
-                        logger.debug(f"📊 SKIP {market_ticker}: outcome determined, no price edge — {reason}")
+                        if log_debug:
+                            logger.debug(f"📊 SKIP {market_ticker}: outcome determined, no price edge — {reason}")
 
                         if hasattr(self, '_bot_ref') and self._bot_ref:
                             self._bot_ref.determined_outcome_markets.add(market_ticker)
 
                         # Cancel any resting orders for this market since outcome is certain
                         try:
-                            all_orders = self.client.get_orders(status='resting', use_cache=False)
-                            market_orders = [o for o in all_orders if o.get('ticker') == market_ticker]
+                            market_orders = self.client.get_orders(status='resting', use_cache=False,
+                                                                   ticker=market_ticker)
 
                             if market_orders:
                                 logger.info(f"🚫 Cancelling {len(market_orders)} resting order(s) for {market_ticker} (outcome determined)")
-                                for order in market_orders:
-                                    order_id = order.get('order_id')
-                                    if order_id:
-                                        try:
-                                            self.client.cancel_order(order_id)
-                                            logger.info(f"   ✅ Cancelled order {order_id}")
-                                        except Exception as cancel_error:
-                                            logger.warning(f"   ⚠️  Failed to cancel order {order_id}: {cancel_error}")
-                                self.client.invalidate_orders_cache()
+                                order_ids = [o['order_id'] for o in market_orders if o.get('order_id')]
+                                # One batched request (invalidates the orders cache itself)
+                                for order_id, cancel_error in self.client.cancel_orders_batch(order_ids).items():
+                                    if cancel_error is None:
+                                        logger.info(f"   ✅ Cancelled order {order_id}")
+                                    else:
+                                        logger.warning(f"   ⚠️  Failed to cancel order {order_id}: {cancel_error}")
                         except Exception as e:
                             logger.warning(f"Failed to fetch/cancel orders for {market_ticker}: {e}")
 
@@ -1650,24 +1983,28 @@ class WeatherDailyStrategy(TradingStrategy):
             forecasts = self.weather_agg.get_all_forecasts(series_ticker, target_date)
 
             if not forecasts:
-                logger.debug(f"📊 SKIP {market_ticker}: no forecasts for {series_ticker} on {target_date.strftime('%Y-%m-%d')}")
+                if log_debug:
+                    logger.debug(f"📊 SKIP {market_ticker}: no forecasts for {series_ticker} on {target_date.strftime('%Y-%m-%d')}")
                 return None
 
             # Log market type for LOW vs HIGH debugging
             market_type = "LOW temp" if is_low_market else "HIGH temp"
             mean_forecast = sum(forecasts) / len(forecasts)
-            logger.debug(f"Evaluating {market_type} market {market_ticker}: {len(forecasts)} forecasts, mean={mean_forecast:.1f}°F, threshold={threshold}")
+            if log_debug:
+                logger.debug(f"Evaluating {market_type} market {market_ticker}: {len(forecasts)} forecasts, mean={mean_forecast:.1f}°F, threshold={threshold}")
 
             # --- FORECAST QUALITY GATE ---
             # Block trades when forecast diversity is too low (identical sources → overconfidence)
             min_sources = getattr(Config, 'MIN_FORECAST_SOURCES', 3)
             if len(forecasts) < min_sources:
-                logger.debug(f"📊 SKIP {market_ticker}: only {len(forecasts)} forecast source(s), need >={min_sources}")
+                if log_debug:
+                    logger.debug(f"📊 SKIP {market_ticker}: only {len(forecasts)} forecast source(s), need >={min_sources}")
                 return None
             forecast_spread = float(np.std(forecasts))
             min_spread = getattr(Config, 'MIN_FORECAST_SPREAD', 0.1)
             if forecast_spread < min_spread:
-                logger.debug(f"📊 SKIP {market_ticker}: forecast spread {forecast_spread:.2f}°F < {min_spread}°F (sources agree too perfectly, likely same upstream)")
+                if log_debug:
+                    logger.debug(f"📊 SKIP {market_ticker}: forecast spread {forecast_spread:.2f}°F < {min_spread}°F (sources agree too perfectly, likely same upstream)")
                 return None
 
             # --- FORECAST DISAGREEMENT GATE ---
@@ -1698,7 +2035,8 @@ class WeatherDailyStrategy(TradingStrategy):
                 dist_to_range = min(abs(mean_forecast - range_low), abs(mean_forecast - range_high))
                 boundary_min_dist = getattr(Config, 'RANGE_BOUNDARY_MIN_DISTANCE', 3.0)
                 if dist_to_range < boundary_min_dist:
-                    logger.debug(f"📊 SKIP {market_ticker}: forecast {mean_forecast:.1f}° only {dist_to_range:.1f}° from range ({range_low}-{range_high}°F) — near-boundary coin flip")
+                    if log_debug:
+                        logger.debug(f"📊 SKIP {market_ticker}: forecast {mean_forecast:.1f}° only {dist_to_range:.1f}° from range ({range_low}-{range_high}°F) — near-boundary coin flip")
                     return None
 
             # --- NEAR-BOUNDARY GUARD (single-threshold markets) ---
@@ -1706,30 +2044,29 @@ class WeatherDailyStrategy(TradingStrategy):
                 dist_from_threshold = abs(mean_forecast - threshold)
                 min_dist = Config.MIN_DEGREES_FROM_THRESHOLD
                 if dist_from_threshold < min_dist:
-                    logger.debug(f"📊 SKIP {market_ticker}: forecast {mean_forecast:.1f}°F only "
-                                 f"{dist_from_threshold:.1f}°F from threshold {threshold}°F — "
-                                 f"need {min_dist:.1f}°F (near-boundary coin flip)")
+                    if log_debug:
+                        logger.debug(f"📊 SKIP {market_ticker}: forecast {mean_forecast:.1f}°F only "
+                                     f"{dist_from_threshold:.1f}°F from threshold {threshold}°F — "
+                                     f"need {min_dist:.1f}°F (near-boundary coin flip)")
                     return None
 
             # Create temperature ranges around the forecast (2-degree brackets)
-            temp_ranges = []
             base_temp = int(mean_forecast) - 10  # Start 10 degrees below
-            for i in range(20):  # 20 brackets of 2 degrees each = 40 degree range
-                temp_ranges.append((base_temp + i * 2, base_temp + (i + 1) * 2))
+            # 20 brackets of 2 degrees each = 40 degree range
+            temp_ranges = list(zip(range(base_temp, base_temp + 40, 2), range(base_temp + 2, base_temp + 42, 2)))
             
             # Build probability distribution with dynamic std and historical data
             is_range = isinstance(threshold, tuple)
-            prob_dist = self.weather_agg.build_probability_distribution(
-                forecasts, temp_ranges, series_ticker, target_date,
-                is_range_market=is_range
+            prob_dist = self._get_probability_distribution(
+                forecasts, temp_ranges, series_ticker, target_date, is_range
             )
             
             if not prob_dist:
-                logger.debug(f"📊 SKIP {market_ticker}: could not build probability distribution")
+                if log_debug:
+                    logger.debug(f"📊 SKIP {market_ticker}: could not build probability distribution")
                 return None
             
             # Calculate our probability for this market
-            market_title = market.get('title', '').lower()
             is_range_market = isinstance(threshold, tuple)
             if is_range_market:
                 range_low, range_high = threshold
@@ -1749,7 +2086,7 @@ class WeatherDailyStrategy(TradingStrategy):
                 is_above_market = True  # used only for CI; use midpoint for approximate CI
                 threshold_for_ci = (range_low + range_high) / 2.0
             else:
-                is_above_market = 'above' in market_title or '>' in market_title
+                is_above_market = title_is_above
                 threshold_for_ci = threshold
                 # Single-threshold (above/below) probability
                 our_prob = 0.0
@@ -1775,7 +2112,8 @@ class WeatherDailyStrategy(TradingStrategy):
                     div_stats = self.settlement_tracker.get_city_divergence(city)
                     conf_adj = div_stats.get('confidence_adjustment', 1.0)
                     if conf_adj < 1.0:
-                        logger.debug(f"📊 Settlement divergence for {city}: prob {our_prob:.3f} * {conf_adj:.2f} = {our_prob * conf_adj:.3f}")
+                        if log_debug:
+                            logger.debug(f"📊 Settlement divergence for {city}: prob {our_prob:.3f} * {conf_adj:.2f} = {our_prob * conf_adj:.3f}")
                         our_prob *= conf_adj
                 except Exception:
                     pass
@@ -1786,23 +2124,22 @@ class WeatherDailyStrategy(TradingStrategy):
             # First entries [0] = lowest bids (buyers paying least)
             # Last entries [-1] = highest bids (buyers paying most) = best bid
             # For asks: YES ask = 100 - NO bid, NO ask = 100 - YES bid
-            yes_orders = orderbook.get('orderbook', {}).get('yes', [])
-            no_orders = orderbook.get('orderbook', {}).get('no', [])
+            book = orderbook.get('orderbook', {})
+            yes_orders = book.get('yes', [])
+            no_orders = book.get('no', [])
 
             if not yes_orders or not no_orders:
-                logger.debug(f"📊 SKIP {market_ticker}: empty orderbook (no yes/no orders)")
+                if log_debug:
+                    logger.debug(f"📊 SKIP {market_ticker}: empty orderbook (no yes/no orders)")
                 return None
 
-            # Use market prices as fallback
-            yes_market_price = market.get('yes_price', 50)
-            no_market_price = market.get('no_price', 50)
-
             # Kalshi orderbook: each side lists BIDS (what buyers will pay) sorted ascending
             # The [-1] entry is the HIGHEST BID (best bid), not the ask
             # ASK for one side = 100 - best BID for the other side
             # Example: if best NO bid is 40, then YES ask = 100 - 40 = 60
-            best_yes_bid = yes_orders[-1][0] if yes_orders else yes_market_price
-            best_no_bid = no_orders[-1][0] if no_orders else no_market_price
+            # (both sides are non-empty here, so no market-price fallback is needed)
+            best_yes_bid = yes_orders[-1][0]
+            best_no_bid = no_orders[-1][0]
 
             # Calculate actual ASK prices (what we'd pay to buy)
             best_yes_ask = 100 - best_no_bid  # YES ask = 100 - NO bid
@@ -1833,7 +2170,8 @@ class WeatherDailyStrategy(TradingStrategy):
 
             # EARLY PRICE CHECK: Skip if BOTH sides are too expensive (saves calculation time)
             if best_yes_ask > Config.MAX_BUY_PRICE_CENTS and best_no_ask > Config.MAX_BUY_PRICE_CENTS:
-                logger.debug(f"📊 SKIP {market_ticker}: both YES ({best_yes_ask}¢) and NO ({best_no_ask}¢) exceed max price ({Config.MAX_BUY_PRICE_CENTS}¢)")
+                if log_debug:
+                    logger.debug(f"📊 SKIP {market_ticker}: both YES ({best_yes_ask}¢) and NO ({best_no_ask}¢) exceed max price ({Config.MAX_BUY_PRICE_CENTS}¢)")
                 return None
 
             # Calculate edge for YES side using ASK price (what we'd actually pay)
@@ -1843,6 +2181,49 @@ class WeatherDailyStrategy(TradingStrategy):
             no_prob = 1.0 - our_prob
             no_edge = self.weather_agg.calculate_edge(no_prob, int(best_no_ask))
             
+            # Get required edge based on price (scaled edge for expensive contracts).
+            # Depends only on the asks, so it's known before the CI / fill-price / exposure work.
+            # NO premium uses max() not multiply — scaled edge and NO premium address
+            # different risks (price risk vs side bias), stacking them would be 8%*1.5*1.5=18%
+            required_yes_edge = self._get_required_edge(best_yes_ask)
+            base_no_edge = self.min_edge_threshold
+            no_premium_edge = base_no_edge * Config.NO_EDGE_MULTIPLIER
+            scaled_no_edge = self._get_required_edge(best_no_ask)
+            required_no_edge = max(no_premium_edge, scaled_no_edge)
+
+            # Range markets: require higher edge and enforce lower price cap
+            range_yes_blocked = False
+            range_no_blocked = False
+            min_ev = self.min_ev_threshold
+            if is_range_market:
+                range_edge_mult = getattr(Config, 'RANGE_MIN_EDGE_MULTIPLIER', 2.0)
+                required_yes_edge *= range_edge_mult
+                required_no_edge *= range_edge_mult
+                range_max_price = getattr(Config, 'RANGE_MAX_BUY_PRICE_CENTS', 25)
+                # Range cap enforced here via range_*_blocked (no re-check in the side gates below)
+                if best_yes_ask > range_max_price:
+                    if log_debug:
+                        logger.debug(f"📊 Range cap: {market_ticker} YES ask {best_yes_ask}¢ > {range_max_price}¢ — blocked")
+                    range_yes_blocked = True
+                if best_no_ask > range_max_price:
+                    if log_debug:
+                        logger.debug(f"📊 Range cap: {market_ticker} NO ask {best_no_ask}¢ > {range_max_price}¢ — blocked")
+                    range_no_blocked = True
+
+            # EARLY EDGE CHECK: neither side can clear its conservative edge requirement and
+            # no longshot qualifies, so the final verdict is already "best edge < required"
+            # (same SKIP line as the diagnostics at the end; skips the heavier work below)
+            best_edge = max(yes_edge, no_edge)
+            min_required_edge = min(required_yes_edge, required_no_edge)
+            longshot_possible = self.longshot_enabled and (
+                (best_yes_ask <= self.longshot_max_price and our_prob >= self.longshot_min_prob / 100.0
+                 and yes_edge >= self.longshot_min_edge)
+                or (best_no_ask <= self.longshot_max_price and no_prob >= self.longshot_min_prob / 100.0
+                    and no_edge >= self.longshot_min_edge))
+            if best_edge < min_required_edge and not longshot_possible:
+                logger.info(f"📊 SKIP {market_ticker}: best edge {best_edge:.1f}% < {min_required_edge:.1f}%")
+                return None
+
             # Calculate confidence intervals for probability estimates
             # For "above" markets, YES = temp > threshold; for "below", YES = temp < threshold
             # For range markets we use midpoint for approximate CI
@@ -1862,10 +2243,9 @@ class WeatherDailyStrategy(TradingStrategy):
                     return None
 
             # Estimate fill prices based on orderbook depth (for position sizing)
-            estimated_yes_price = self.weather_agg.estimate_fill_price(orderbook, 'yes', 
-                                                                       self.max_position_size * 5)
-            estimated_no_price = self.weather_agg.estimate_fill_price(orderbook, 'no', 
-                                                                      self.max_position_size * 5)
+            fill_qty = self.max_position_size * 5  # longshot-sized order, the largest we'd place
+            estimated_yes_price = self.weather_agg.estimate_fill_price(orderbook, 'yes', fill_qty)
+            estimated_no_price = self.weather_agg.estimate_fill_price(orderbook, 'no', fill_qty)
             
             # Use estimated fill price if significantly different from best ask
             # (indicates we might experience slippage)
@@ -1888,7 +2268,8 @@ class WeatherDailyStrategy(TradingStrategy):
             # CRITICAL FIX: Check if we already have a resting order on THIS EXACT ticker
             # This prevents the bug where we place multiple orders on the same ticker every scan
             if self._has_resting_order_on_ticker(market_ticker):
-                logger.debug(f"📊 SKIP {market_ticker}: already have resting order on this ticker")
+                if log_debug:
+                    logger.debug(f"📊 SKIP {market_ticker}: already have resting order on this ticker")
                 return None
 
             # Check existing exposure on this BASE MARKET BEFORE placing new orders
@@ -1905,18 +2286,21 @@ class WeatherDailyStrategy(TradingStrategy):
             # HARD BLOCK: If we're already at or over dollar limit, skip this market
             # This enforces the $5 limit even if existing orders already exceeded it
             if existing_dollars >= Config.MAX_DOLLARS_PER_MARKET:
-                logger.debug(f"📊 SKIP {market_ticker}: already at dollar limit ${existing_dollars:.2f}/${Config.MAX_DOLLARS_PER_MARKET:.2f} for {base_market}")
+                if log_debug:
+                    logger.debug(f"📊 SKIP {market_ticker}: already at dollar limit ${existing_dollars:.2f}/${Config.MAX_DOLLARS_PER_MARKET:.2f} for {base_market}")
                 return None
 
             # If we're at or over contract limits, skip this market
             if contracts_remaining == 0:
-                logger.debug(f"📊 SKIP {market_ticker}: at BASE MARKET position limit ({existing_contracts}/{Config.MAX_CONTRACTS_PER_MARKET} contracts, ${existing_dollars:.2f}/${Config.MAX_DOLLARS_PER_MARKET:.2f}) for {base_market}")
+                if log_debug:
+                    logger.debug(f"📊 SKIP {market_ticker}: at BASE MARKET position limit ({existing_contracts}/{Config.MAX_CONTRACTS_PER_MARKET} contracts, ${existing_dollars:.2f}/${Config.MAX_DOLLARS_PER_MARKET:.2f}) for {base_market}")
                 return None
 
             # Track which sides we already hold on this base market (for contradictory position detection)
             existing_sides = existing_exposure.get('sides_held', set())
 
-            logger.debug(f"✅ {market_ticker}: {contracts_remaining} contracts, ${dollars_remaining:.2f} remaining for BASE MARKET {base_market} (current: {existing_contracts} contracts, ${existing_dollars:.2f})")
+            if log_debug:
+                logger.debug(f"✅ {market_ticker}: {contracts_remaining} contracts, ${dollars_remaining:.2f} remaining for BASE MARKET {base_market} (current: {existing_contracts} contracts, ${existing_dollars:.2f})")
             
             # Skip ALL new trades on today's markets once the extreme (high/low) of day has likely occurred.
             # Official report is typically in by afternoon; buying after that is bad (outcome known or soon known).
@@ -1931,7 +2315,8 @@ class WeatherDailyStrategy(TradingStrategy):
             )
             if skip_todays_market_past_report:
                 market_type = "high" if is_high_market else "low" if is_low_market else "temperature"
-                logger.debug(f"📊 SKIP {market_ticker}: today's market past report time — {market_type} of day likely already occurred (no new buys)")
+                if log_debug:
+                    logger.debug(f"📊 SKIP {market_ticker}: today's market past report time — {market_type} of day likely already occurred (no new buys)")
                 return None
             
             # DUAL STRATEGY: Check both conservative and longshot modes
@@ -1950,23 +2335,28 @@ class WeatherDailyStrategy(TradingStrategy):
             if self.longshot_enabled:
                 yes_candidate = None
                 no_candidate = None
+                ls_max_price = self.longshot_max_price
+                ls_min_prob = self.longshot_min_prob / 100.0
+                ls_min_edge = self.longshot_min_edge
 
-                if (best_yes_ask <= self.longshot_max_price and
-                    our_prob >= (self.longshot_min_prob / 100.0) and
-                    yes_edge >= self.longshot_min_edge):
+                if (best_yes_ask <= ls_max_price and
+                    our_prob >= ls_min_prob and
+                    yes_edge >= ls_min_edge):
                     yes_candidate = self._build_side_decision(
                         'yes', yes_edge, yes_ev, our_prob, best_yes_ask,
                         ci_lower_yes, ci_upper_yes, is_longshot=True, **common_args)
 
-                if (best_no_ask <= self.longshot_max_price and
-                    no_prob >= (self.longshot_min_prob / 100.0) and
-                    no_edge >= self.longshot_min_edge):
+                if (best_no_ask <= ls_max_price and
+                    no_prob >= ls_min_prob and
+                    no_edge >= ls_min_edge):
                     no_candidate = self._build_side_decision(
                         'no', no_edge, no_ev, no_prob, best_no_ask,
                         ci_lower_no, ci_upper_no, is_longshot=True, **common_args)
 
                 decision = self._pick_best_candidate(yes_candidate, no_candidate)
                 if decision:
+                    if self._checking_exit:
+                        return decision  # Exit re-evaluation: the outer call commits it
                     self._finalize_decision(decision, market_ticker)
                     # Defer to cross-threshold comparison: keep best EV per base market
                     self._defer_decision(decision, market_ticker)
@@ -1977,30 +2367,6 @@ class WeatherDailyStrategy(TradingStrategy):
             high_confidence_yes = ci_lower_yes > best_yes_ask / 100.0
             high_confidence_no = ci_lower_no > best_no_ask / 100.0
 
-            # Get required edge based on price (scaled edge for expensive contracts)
-            # NO premium uses max() not multiply — scaled edge and NO premium address
-            # different risks (price risk vs side bias), stacking them would be 8%*1.5*1.5=18%
-            required_yes_edge = self._get_required_edge(best_yes_ask)
-            base_no_edge = self.min_edge_threshold
-            no_premium_edge = base_no_edge * Config.NO_EDGE_MULTIPLIER
-            scaled_no_edge = self._get_required_edge(best_no_ask)
-            required_no_edge = max(no_premium_edge, scaled_no_edge)
-
-            # Range markets: require higher edge and enforce lower price cap
-            range_yes_blocked = False
-            range_no_blocked = False
-            if is_range_market:
-                range_edge_mult = getattr(Config, 'RANGE_MIN_EDGE_MULTIPLIER', 2.0)
-                required_yes_edge *= range_edge_mult
-                required_no_edge *= range_edge_mult
-                range_max_price = getattr(Config, 'RANGE_MAX_BUY_PRICE_CENTS', 25)
-                if best_yes_ask > range_max_price:
-                    logger.debug(f"📊 Range cap: {market_ticker} YES ask {best_yes_ask}¢ > {range_max_price}¢ — blocked")
-                    range_yes_blocked = True
-                if best_no_ask > range_max_price:
-                    logger.debug(f"📊 Range cap: {market_ticker} NO ask {best_no_ask}¢ > {range_max_price}¢ — blocked")
-                    range_no_blocked = True
-
             yes_candidate = None
             no_candidate = None
 
@@ -2028,25 +2394,25 @@ class WeatherDailyStrategy(TradingStrategy):
                         f"yes_ask={best_yes_ask}¢ no_ask={best_no_ask}¢ req_edge={required_yes_edge:.1f}%")
 
             if (forecast_supports_yes and not range_yes_blocked and not yes_blocked_by_floor
-                    and yes_edge >= required_yes_edge and yes_ev >= self.min_ev_threshold
-                    and (not self.require_high_confidence or high_confidence_yes)
-                    and (not is_range_market or best_yes_ask <= getattr(Config, 'RANGE_MAX_BUY_PRICE_CENTS', 25))):
+                    and yes_edge >= required_yes_edge and yes_ev >= min_ev
+                    and (not self.require_high_confidence or high_confidence_yes)):
                 yes_candidate = self._build_side_decision(
                     'yes', yes_edge, yes_ev, our_prob, best_yes_ask,
                     ci_lower_yes, ci_upper_yes, is_longshot=False, **common_args)
 
             max_no_price = getattr(Config, 'MAX_NO_BUY_PRICE_CENTS', 30)
             if (forecast_supports_no and not range_no_blocked
-                    and no_edge >= required_no_edge and no_ev >= self.min_ev_threshold
+                    and no_edge >= required_no_edge and no_ev >= min_ev
                     and best_no_ask <= max_no_price
-                    and (not self.require_high_confidence or high_confidence_no)
-                    and (not is_range_market or best_no_ask <= getattr(Config, 'RANGE_MAX_BUY_PRICE_CENTS', 25))):
+                    and (not self.require_high_confidence or high_confidence_no)):
                 no_candidate = self._build_side_decision(
                     'no', no_edge, no_ev, no_prob, best_no_ask,
                     ci_lower_no, ci_upper_no, is_longshot=False, **common_args)
 
             decision = self._pick_best_candidate(yes_candidate, no_candidate)
             if decision:
+                if self._checking_exit:
+                    return decision  # Exit re-evaluation: the outer call commits it
                 self._finalize_decision(decision, market_ticker)
                 # Defer to cross-threshold comparison: keep best EV per base market
                 self._defer_decision(decision, market_ticker)
@@ -2060,14 +2426,14 @@ class WeatherDailyStrategy(TradingStrategy):
                 reason = f"YES edge {yes_edge:.1f}% but forecast {mean_forecast:.1f}°F wrong side of {threshold}°F"
             elif not forecast_supports_no and no_edge >= required_no_edge:
                 reason = f"NO edge {no_edge:.1f}% but forecast {mean_forecast:.1f}°F wrong side of {threshold}°F"
-            elif yes_edge >= required_yes_edge and yes_ev >= self.min_ev_threshold and self.require_high_confidence and not high_confidence_yes:
+            elif yes_edge >= required_yes_edge and yes_ev >= min_ev and self.require_high_confidence and not high_confidence_yes:
                 reason = f"YES edge {yes_edge:.1f}% EV ${yes_ev:.4f} ok but CI overlaps ask (REQUIRE_HIGH_CONFIDENCE=false to allow)"
-            elif no_edge >= required_no_edge and no_ev >= self.min_ev_threshold and self.require_high_confidence and not high_confidence_no:
+            elif no_edge >= required_no_edge and no_ev >= min_ev and self.require_high_confidence and not high_confidence_no:
                 reason = f"NO edge {no_edge:.1f}% EV ${no_ev:.4f} ok but CI overlaps ask (REQUIRE_HIGH_CONFIDENCE=false to allow)"
             elif best_edge < min_required_edge:
                 reason = f"best edge {best_edge:.1f}% < {min_required_edge:.1f}%"
-            elif best_ev < self.min_ev_threshold:
-                reason = f"edge ok, best EV ${best_ev:.4f} < ${self.min_ev_threshold}"
+            elif best_ev < min_ev:
+                reason = f"edge ok, best EV ${best_ev:.4f} < ${min_ev}"
             else:
                 reason = "no side met edge/EV/confidence"
             logger.info(f"📊 SKIP {market_ticker}: {reason}")
@@ -2116,13 +2482,14 @@ class WeatherDailyStrategy(TradingStrategy):
                         winning_side = 'yes' if observed_extreme <= threshold else 'no'
 
             # Get orderbook prices
-            yes_orders = orderbook.get('orderbook', {}).get('yes', [])
-            no_orders = orderbook.get('orderbook', {}).get('no', [])
+            book = orderbook.get('orderbook', {})
+            yes_orders = book.get('yes', [])
+            no_orders = book.get('no', [])
             if not yes_orders or not no_orders:
                 return None
 
-            best_yes_bid = yes_orders[-1][0] if yes_orders else 50
-            best_no_bid = no_orders[-1][0] if no_orders else 50
+            best_yes_bid = yes_orders[-1][0]
+            best_no_bid = no_orders[-1][0]
             best_yes_ask = 100 - best_no_bid
             best_no_ask = 100 - best_yes_bid
 
@@ -2230,139 +2597,130 @@ class WeatherDailyStrategy(TradingStrategy):
         Returns:
             Exit decision dict or None
         """
+        self._exit_recheck = None
+
         # Check if exit logic is enabled
         if not Config.EXIT_LOGIC_ENABLED:
             return None
 
-        try:
-            position = self.active_positions.get(market_ticker)
-            if not position:
-                return None
-            
-            side = position['side']
-            entry_price = position.get('entry_price', 0)
-            entry_time = position.get('entry_time')
-            entry_edge = position.get('edge', 0)
-
-            # Never exit cheap contracts — risk is capped and upside is massive
-            # e.g. 7c entry: max loss 7c, max gain 93c (13:1). Hold to settlement.
-            if entry_price <= Config.EXIT_MIN_ENTRY_PRICE:
-                return None
-
-            # Don't exit too quickly (at least 5 minutes for daily markets)
-            if entry_time and (datetime.now() - entry_time).total_seconds() < 300:
-                return None
-            
-            # Get current market prices
-            yes_orders = orderbook.get('orderbook', {}).get('yes', [])
-            no_orders = orderbook.get('orderbook', {}).get('no', [])
-            
-            if not yes_orders or not no_orders:
-                return None
-            
-            # Calculate current ask prices
-            best_no_bid = no_orders[-1][0] if no_orders else 50
-            best_yes_bid = yes_orders[-1][0] if yes_orders else 50
-            current_yes_ask = 100 - best_no_bid
-            current_no_ask = 100 - best_yes_bid
-            
-            # Calculate current profit/loss
-            # For both YES and NO: profit = what we can sell for now - what we paid
-            # We can sell by placing an order on the opposite side
-            if side == 'yes':
-                # We own YES, can sell at YES bid price
-                sell_price = yes_orders[-1][0] if yes_orders else 50
-            else:
-                # We own NO, can sell at NO bid price
-                sell_price = no_orders[-1][0] if no_orders else 50
-
-            entry_cost = entry_price / 100.0
-            current_value = sell_price / 100.0
-            profit_cents = sell_price - entry_price
-            profit_pct = ((current_value - entry_cost) / entry_cost) * 100 if entry_cost > 0 else 0
-
-            # Exit condition 1: Take profit (configurable threshold)
-            take_profit_threshold = Config.EXIT_TAKE_PROFIT_PERCENT
-            min_profit_cents = Config.EXIT_MIN_PROFIT_CENTS
-            if profit_pct >= take_profit_threshold and profit_cents >= min_profit_cents:
-                logger.info(f"💰 Taking profit on {market_ticker}: {side.upper()} entry {entry_price}¢ -> sell {sell_price}¢ ({profit_pct:.1f}% / {profit_cents}¢ profit)")
-                del self.active_positions[market_ticker]
-                return {
-                    'action': 'sell',
-                    'side': side,
-                    'count': position.get('count', 1),
-                    'price': int(sell_price - 1),  # Slightly below bid to exit quickly
-                    'reason': 'take_profit',
-                    'entry_price': entry_price
-                }
-            
-            # Exit condition 2: Stop loss (price moved 30%+ against us)
-            # Disabled for now - weather markets often recover, stop loss causes unnecessary losses
-            # if profit_pct <= -30:
-            #     logger.warning(f"Stop loss triggered on {market_ticker}: {side.upper()} entry {entry_price}¢ -> sell {sell_price}¢ ({profit_pct:.1f}% loss)")
-            #     del self.active_positions[market_ticker]
-            #     return {
-            #         'action': 'sell',
-            #         'side': side,
-            #         'count': position.get('count', 1),
-            #         'price': int(sell_price - 1),
-            #         'reason': 'stop_loss'
-            #     }
-            
-            # Exit condition 3: Edge disappeared (re-evaluate market)
-            # Hybrid approach:
-            #   - Profitable exits: after 30 min (lock in gains when edge is gone)
-            #   - Loss-cutting exits: after 60 min if loss < 5% (cut small losers, but
-            #     give thesis time to play out before deciding)
-            min_hold_for_profit_exit = 1800   # 30 min for profitable exits
-            min_hold_for_loss_exit = 3600     # 60 min for loss-cutting exits
-            max_loss_for_exit = -5            # only cut if loss > -5%
-            hold_seconds = (datetime.now() - entry_time).total_seconds() if entry_time else 0
-
-            should_check_edge = (
-                (hold_seconds >= min_hold_for_profit_exit and profit_pct > 0) or
-                (hold_seconds >= min_hold_for_loss_exit and profit_pct >= max_loss_for_exit)
-            )
+        position = self.active_positions.get(market_ticker)
+        if not position:
+            return None
+        
+        side = position.side
+        entry_price = position.entry_price
+        entry_edge = position.edge
 
-            if should_check_edge:
-                try:
-                    self._checking_exit = True
-                    decisions = self.get_trade_decision(market, orderbook)
-                    edge_still_exists = False
-                    if decisions:
-                        for decision in decisions if isinstance(decisions, list) else [decisions]:
-                            if decision and decision.get('side') == side:
-                                current_edge = decision.get('edge', 0)
-                                if decision.get('strategy_mode') == 'longshot':
-                                    edge_still_exists = current_edge >= self.longshot_min_edge
-                                else:
-                                    edge_still_exists = current_edge >= self.min_edge_threshold
-                                break
-
-                    if not edge_still_exists and entry_edge > 0:
-                        if profit_pct > 0:
-                            logger.info(f"📉 Edge disappeared on {market_ticker}: {side.upper()} (was {entry_edge:.1f}%), profitable exit at {sell_price}¢ (+{profit_pct:.1f}%)")
-                        else:
-                            logger.info(f"✂️ Loss-cutting on {market_ticker}: {side.upper()} (was {entry_edge:.1f}%), exit at {sell_price}¢ ({profit_pct:.1f}%)")
-                        del self.active_positions[market_ticker]
-                        return {
-                            'action': 'sell',
-                            'side': side,
-                            'count': position.get('count', 1),
-                            'price': int(sell_price - 1),
-                            'reason': 'edge_gone',
-                            'entry_price': entry_price
-                        }
-                except Exception as e:
-                    logger.debug(f"Could not re-evaluate edge for {market_ticker}: {e}")
-                finally:
-                    self._checking_exit = False
+        # Never exit cheap contracts — risk is capped and upside is massive
+        # e.g. 7c entry: max loss 7c, max gain 93c (13:1). Hold to settlement.
+        if entry_price <= Config.EXIT_MIN_ENTRY_PRICE:
+            return None
 
+        # Don't exit too quickly (at least 5 minutes for daily markets)
+        hold_seconds = time.monotonic() - position.entry_mono
+        if hold_seconds < 300:
             return None
-            
-        except Exception as e:
-            logger.error(f"Error in _check_exit for {market_ticker}: {e}", exc_info=True)
+        
+        # Get current market prices (no book or a missing side means no exit price)
+        try:
+            book = orderbook['orderbook']
+            yes_orders = book['yes']
+            no_orders = book['no']
+        except (KeyError, TypeError):
+            return None
+        
+        if not yes_orders or not no_orders:
             return None
+        
+        # Calculate current profit/loss
+        # For both YES and NO: profit = what we can sell for now - what we paid
+        # We own `side`, so we can sell at that side's best bid (last element, arrays ascend)
+        sell_price = (yes_orders if side == 'yes' else no_orders)[-1][0]
+
+        entry_cost = entry_price / 100.0
+        current_value = sell_price / 100.0
+        profit_cents = sell_price - entry_price
+        profit_pct = ((current_value - entry_cost) / entry_cost) * 100 if entry_cost > 0 else 0
+
+        # Exit condition 1: Take profit (configurable threshold)
+        take_profit_threshold = Config.EXIT_TAKE_PROFIT_PERCENT
+        min_profit_cents = Config.EXIT_MIN_PROFIT_CENTS
+        if profit_pct >= take_profit_threshold and profit_cents >= min_profit_cents:
+            logger.info(f"💰 Taking profit on {market_ticker}: {side.upper()} entry {entry_price}¢ -> sell {sell_price}¢ ({profit_pct:.1f}% / {profit_cents}¢ profit)")
+            del self.active_positions[market_ticker]
+            return {
+                'action': 'sell',
+                'side': side,
+                'count': position.count,
+                'price': int(sell_price - 1),  # Slightly below bid to exit quickly
+                'reason': 'take_profit',
+                'entry_price': entry_price
+            }
+        
+        # Exit condition 2: Stop loss (price moved 30%+ against us)
+        # Disabled for now - weather markets often recover, stop loss causes unnecessary losses
+        # if profit_pct <= -30:
+        #     logger.warning(f"Stop loss triggered on {market_ticker}: {side.upper()} entry {entry_price}¢ -> sell {sell_price}¢ ({profit_pct:.1f}% loss)")
+        #     del self.active_positions[market_ticker]
+        #     return {
+        #         'action': 'sell',
+        #         'side': side,
+        #         'count': position.count,
+        #         'price': int(sell_price - 1),
+        #         'reason': 'stop_loss'
+        #     }
+        
+        # Exit condition 3: Edge disappeared (re-evaluate market)
+        # Hybrid approach:
+        #   - Profitable exits: after 30 min (lock in gains when edge is gone)
+        #   - Loss-cutting exits: after 60 min if loss < 5% (cut small losers, but
+        #     give thesis time to play out before deciding)
+        min_hold_for_profit_exit = 1800   # 30 min for profitable exits
+        min_hold_for_loss_exit = 3600     # 60 min for loss-cutting exits
+        max_loss_for_exit = -5            # only cut if loss > -5%
+
+        should_check_edge = (
+            (hold_seconds >= min_hold_for_profit_exit and profit_pct > 0) or
+            (hold_seconds >= min_hold_for_loss_exit and profit_pct >= max_loss_for_exit)
+        )
+
+        if should_check_edge:
+            try:
+                self._checking_exit = True
+                decisions = self.get_trade_decision(market, orderbook)
+                # Hand the evaluation to the outer get_trade_decision if we don't exit
+                self._exit_recheck = (decisions,)
+                edge_still_exists = False
+                if decisions:
+                    for decision in decisions if isinstance(decisions, list) else [decisions]:
+                        if decision and decision.get('side') == side:
+                            current_edge = decision.get('edge', 0)
+                            if decision.get('strategy_mode') == 'longshot':
+                                edge_still_exists = current_edge >= self.longshot_min_edge
+                            else:
+                                edge_still_exists = current_edge >= self.min_edge_threshold
+                            break
+
+                if not edge_still_exists and entry_edge > 0:
+                    if profit_pct > 0:
+                        logger.info(f"📉 Edge disappeared on {market_ticker}: {side.upper()} (was {entry_edge:.1f}%), profitable exit at {sell_price}¢ (+{profit_pct:.1f}%)")
+                    else:
+                        logger.info(f"✂️ Loss-cutting on {market_ticker}: {side.upper()} (was {entry_edge:.1f}%), exit at {sell_price}¢ ({profit_pct:.1f}%)")
+                    del self.active_positions[market_ticker]
+                    return {
+                        'action': 'sell',
+                        'side': side,
+                        'count': position.count,
+                        'price': int(sell_price - 1),
+                        'reason': 'edge_gone',
+                        'entry_price': entry_price
+                    }
+            except Exception as e:
+                logger.debug(f"Could not re-evaluate edge for {market_ticker}: {e}")
+            finally:
+                self._checking_exit = False
+
+        return None
 
 
 class StrategyManager:
@@ -1710,22 +1710,22 @@ class WeatherDataAggregator:
 
         # Build probability distribution using normal distribution
         # This models uncertainty around the mean forecast
-        distribution = {}
-        total_prob = 0
+        if not temperature_ranges:
+            return {}
 
-        for temp_min, temp_max in temperature_ranges:
-            # Probability that temperature falls in this range
-            # Using cumulative distribution function
-            prob = stats.norm.cdf(temp_max, mean_temp, std_temp) - stats.norm.cdf(temp_min, mean_temp, std_temp)
-            distribution[(temp_min, temp_max)] = max(0, prob)  # Ensure non-negative
-            total_prob += prob
+        # Probability that temperature falls in each range, via the CDF at every
+        # range edge in a single vectorized call (row 0 = mins, row 1 = maxes)
+        edges = np.asarray(temperature_ranges, dtype=float).T
+        cdf = stats.norm.cdf(edges, mean_temp, std_temp)
+        probs = cdf[1] - cdf[0]
+        total_prob = probs.sum()
+        probs = np.maximum(probs, 0)  # Ensure non-negative
 
         # Normalize probabilities to sum to 1
         if total_prob > 0:
-            for key in distribution:
-                distribution[key] /= total_prob
+            probs = probs / total_prob
 
-        return distribution
+        return dict(zip(temperature_ranges, probs.tolist()))
     
     def update_forecast_error(self, series_ticker: str, target_date: datetime, actual_temp: float, predicted_temp: float):
         """
@@ -2034,27 +2034,23 @@ class WeatherDataAggregator:
         if not forecasts or len(forecasts) < 2:
             return 0.5, (0.0, 1.0)  # No confidence with insufficient data
         
-        probs = []
-        mean_forecast = np.mean(forecasts)
-        std_forecast = max(np.std(forecasts), min_std) if len(forecasts) > 1 else min_std
-
-        for _ in range(n_samples):
-            # Resample forecasts with replacement
-            sample = np.random.choice(forecasts, size=len(forecasts), replace=True)
-            sample_mean = np.mean(sample)
-            sample_std = max(np.std(sample), min_std) if len(sample) > 1 else std_forecast
+        # Resample forecasts with replacement: all n_samples bootstrap draws at once,
+        # one row per sample (same draw order as sampling row by row)
+        samples = np.random.choice(forecasts, size=(n_samples, len(forecasts)), replace=True)
+        sample_mean = samples.mean(axis=1)
+        sample_std = np.maximum(samples.std(axis=1), min_std)
+
+        # Calculate probability for each sample in one vectorized CDF call
+        cdf = stats.norm.cdf(threshold, sample_mean, sample_std)
+        if is_above:
+            # Probability that temp > threshold
+            probs = 1.0 - cdf
+        else:
+            # Probability that temp < threshold
+            probs = cdf
+        # Cap: no weather forecast is 100% or 0% certain
+        probs = np.clip(probs, 0.01, 0.99)
 
-            # Calculate probability for this sample
-            if is_above:
-                # Probability that temp > threshold
-                prob = 1.0 - stats.norm.cdf(threshold, sample_mean, sample_std)
-            else:
-                # Probability that temp < threshold
-                prob = stats.norm.cdf(threshold, sample_mean, sample_std)
-            # Cap: no weather forecast is 100% or 0% certain
-            prob = max(0.01, min(0.99, prob))
-            probs.append(prob)
-        
         # Calculate mean and 95% confidence interval
         mean_prob = np.mean(probs)
         ci_lower = np.percentile(probs, 2.5)
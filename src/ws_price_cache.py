@@ -14,7 +14,7 @@ import logging
 import threading
 import time
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, Optional, Set
 
 from .config import Config
 
@@ -31,6 +31,8 @@ class WsPriceCache:
         self._connected = False
         self._last_message_time = 0.0
         self._message_count = 0
+        # Tickers reported settled via market_lifecycle_v2, drained by the scan loop
+        self._settled_tickers: Set[str] = set()
 
     def update_ticker(self, ticker: str, yes_bid: int, yes_ask: int):
         """Update cached price for a ticker (called from WS thread)."""
@@ -66,6 +68,22 @@ class WsPriceCache:
                 return None
             return entry.copy()
 
+    def mark_settled(self, ticker: str):
+        """Record a market settlement pushed over WebSocket (called from WS thread)."""
+        with self._lock:
+            self._settled_tickers.add(ticker)
+
+    def pop_settled(self) -> Set[str]:
+        """Return and clear tickers reported settled since the last call."""
+        with self._lock:
+            settled = self._settled_tickers
+            self._settled_tickers = set()
+        return settled
+
+    def is_connected(self) -> bool:
+        """Whether the WebSocket connection is currently up."""
+        return self._connected
+
     def set_connected(self, connected: bool):
         """Update connection status."""
         self._connected = connected
@@ -88,7 +106,9 @@ def run_ws_cache(ws_cache: WsPriceCache, client):
     """Run WebSocket connection feeding prices into cache.
 
     This function runs in a daemon thread. It connects to the Kalshi WS,
-    subscribes to ticker updates, and feeds prices into ws_cache.
+    subscribes to ticker updates, and feeds prices into ws_cache. Market
+    lifecycle events are also subscribed so settlements are pushed to the
+    outcome tracker instead of waiting for the next poll.
 
     Args:
         ws_cache: WsPriceCache instance to feed prices into
@@ -114,12 +134,12 @@ def run_ws_cache(ws_cache: WsPriceCache, client):
                     ws_cache.set_connected(True)
                     logger.info("WebSocket connected for price cache")
 
-                    # Subscribe to ticker channel
+                    # Subscribe to ticker and market lifecycle (settlement) channels
                     subscribe_msg = {
                         'id': 1,
                         'cmd': 'subscribe',
                         'params': {
-                            'channels': ['ticker'],
+                            'channels': ['ticker', 'market_lifecycle_v2'],
                         }
                     }
                     await ws.send(json.dumps(subscribe_msg))
@@ -151,6 +171,15 @@ def run_ws_cache(ws_cache: WsPriceCache, client):
                                 if ticker:
                                     ws_cache.update_ticker(ticker, yes_bid, yes_ask)
 
+                            elif msg_type == 'market_lifecycle_v2':
+                                event = data.get('msg', data.get('data', {}))
+                                ticker = event.get('market_ticker', '')
+                                # The channel covers every market on the exchange; only
+                                # weather settlements are worth an outcome check
+                                if (event.get('event_type') == 'settled'
+                                        and ticker.startswith(Config.WEATHER_TICKER_PREFIXES)):
+                                    ws_cache.mark_settled(ticker)
+
                             elif msg_type == 'orderbook_snapshot' or msg_type == 'orderbook_delta':
                                 # Could also extract best bid/ask from orderbook updates
                                 pass